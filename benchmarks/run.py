@@ -0,0 +1,148 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import pygame
+
+# The modules of the planner live in the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import environment
+import planner
+
+# Command line arguments
+parser = argparse.ArgumentParser(description='Benchmarks the construction, collision checking \
+	and queries of the Visibility PRM without any display.')
+parser.add_argument('-o', '--output', type=str, metavar='', required=False,
+	default='benchmark.json', help='JSON file where the results are written')
+parser.add_argument('-s', '--seed', type=int, metavar='', required=False, default=0,
+	help='Seed of the maps, samples and queries')
+parser.add_argument('-M', '--M', type=int, metavar='', required=False, default=100,
+	help='Maximum number of failures before inserting a new guard node')
+parser.add_argument('-r', '--radius', type=int, metavar='', required=False, default=10,
+	help='Robot radius')
+parser.add_argument('-q', '--queries', type=int, metavar='', required=False, default=1000,
+	help='Number of random queries timed on each map')
+parser.add_argument('-c', '--checks', type=int, metavar='', required=False, default=20000,
+	help='Number of collision checks timed on each map')
+parser.add_argument('-og', '--occupancy_grid', type=bool, action=argparse.BooleanOptionalAction,
+	metavar='', required=False, help='Check collisions in a precomputed occupancy grid')
+args = parser.parse_args()
+
+# Map sizes in pixels, and fraction of each map covered by obstacles
+MAP_SIZES = (640, 480), (1280, 960), (2560, 1920)
+DENSITIES = 0.05, 0.15, 0.3
+
+def make_obstacles(map_dimensions, density, rng, size=50):
+	"""Random square obstacles covering roughly the given fraction of the map."""
+	width, height = map_dimensions
+	n = int(density * width * height / size**2)
+	corners = rng.integers(low=0, high=(width - size, height - size), size=(n, 2))
+
+	return [pygame.Rect(x, y, size, size) for x, y in corners.tolist()]
+
+def percentiles(latencies):
+	"""Latency percentiles in milliseconds."""
+	values = np.percentile(np.asarray(latencies) * 1000, (50, 90, 99))
+
+	return {'p50': values[0], 'p90': values[1], 'p99': values[2],
+		'mean': float(np.mean(latencies) * 1000)}
+
+def benchmark_construction(planner_):
+	"""Builds the roadmap, counting the samples."""
+	start = time.perf_counter()
+	samples = planner_.build().termination.samples
+	elapsed = time.perf_counter() - start
+
+	return {'seconds': elapsed, 'samples': samples, 'samples_per_second': samples / elapsed,
+		'guards': len(planner_.guards), 'connections': len(planner_.connections)}
+
+def benchmark_collision(collider, map_dimensions, rng):
+	"""Calls per second of the single point and segment checks."""
+	points = rng.integers(low=0, high=map_dimensions, size=(args.checks, 2)).tolist()
+	ends = rng.integers(low=0, high=map_dimensions, size=(args.checks, 2)).tolist()
+
+	start = time.perf_counter()
+	for point in points:
+		collider.is_free(point=point)
+	is_free = args.checks / (time.perf_counter() - start)
+
+	start = time.perf_counter()
+	for p1, p2 in zip(points, ends):
+		collider.cross_obstacle(p1=p1, p2=p2)
+	cross_obstacle = args.checks / (time.perf_counter() - start)
+
+	return {'is_free_per_second': is_free, 'cross_obstacle_per_second': cross_obstacle}
+
+def benchmark_queries(planner_, rng):
+	"""Latency of the searches along the roadmap and of whole queries."""
+	graph_ = planner_.graph
+	nodes = graph_.roadmap.n_nodes
+	a_star, query = [], []
+
+	for start, end in rng.integers(low=0, high=max(nodes, 1), size=(args.queries, 2)).tolist():
+		if nodes == 0:
+			break
+		begin = time.perf_counter()
+		graph_.shortest_path(start=start, end=end)
+		a_star.append(time.perf_counter() - begin)
+
+	free = list(itertools.islice(planner_.samples, 2*args.queries))
+	found = 0
+
+	for start, goal in zip(free[0::2], free[1::2]):
+		begin = time.perf_counter()
+		found += planner_.query_many([(start, goal)])[0] is not None
+		query.append(time.perf_counter() - begin)
+
+	return {'a_star_ms': percentiles(a_star) if a_star else None,
+		'query_ms': percentiles(query), 'query_success_rate': found / len(query)}
+
+def commit():
+	"""Current git commit of the planner, None outside of a repository."""
+	try:
+		return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+			check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+def main():
+	rng = np.random.default_rng(args.seed)
+	maps = []
+
+	# The original map, then random ones of growing size and density
+	environment_ = environment.Environment(map_dimensions=MAP_SIZES[0], headless=True)
+	environment_.make_obstacles()
+	configurations = [('default', MAP_SIZES[0], None, environment_.sides)]
+	configurations += [(f'random_{width}x{height}_{density}', (width, height), density,
+		make_obstacles((width, height), density, rng)) for width, height in MAP_SIZES
+		for density in DENSITIES]
+
+	for name, map_dimensions, density, obstacles in configurations:
+		planner_ = planner.VisibilityPRM(map_dimensions=map_dimensions, radius=args.radius,
+			obstacles=obstacles, M=args.M, occupancy_grid=args.occupancy_grid, seed=args.seed)
+
+		result = {'name': name, 'map_dimensions': map_dimensions, 'density': density,
+			'obstacles': len(obstacles)}
+		result['construction'] = benchmark_construction(planner_)
+		result['collision'] = benchmark_collision(planner_.graph.collider, map_dimensions, rng)
+		result['queries'] = benchmark_queries(planner_, rng)
+		maps.append(result)
+
+		print(f"{name}: {result['construction']['samples_per_second']:.0f} samples/s, "
+			f"{result['construction']['guards']} guards, "
+			f"query p50 {result['queries']['query_ms']['p50']:.3f} ms")
+
+	report = {'commit': commit(), 'python': platform.python_version(),
+		'numpy': np.__version__, 'parameters': vars(args), 'maps': maps}
+
+	with open(args.output, 'w') as file:
+		json.dump(report, file, indent=2, default=float)
+
+if __name__ == '__main__':
+	main()
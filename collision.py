@@ -0,0 +1,413 @@
+import math
+import numpy as np
+import instrumentation
+import shapes
+
+class RectangleCollider():
+	"""
+	Exact collision checks of the robot against axis-aligned rectangles.
+
+	The robot is the square of half side equal to its radius, so the robot
+	swept along a segment touches a rectangle exactly when the segment
+	crosses the rectangle inflated by the radius on every side. Such test is
+	solved analytically with the slab method instead of interpolating.
+
+	Attributes
+	----------
+	obstacles : list
+		Rectangle obstacles as pygame.Rect.
+	radius : int
+		Robot radius.
+	"""
+
+	def __init__(self, obstacles, radius):
+		self.radius = radius
+
+		# Inflated obstacles as (left, top, right, bottom)
+		self.boxes = [(obstacle.left - radius, obstacle.top - radius,
+			obstacle.right + radius, obstacle.bottom + radius) for obstacle in obstacles]
+		self.bounds = np.array(self.boxes, dtype=float).reshape(-1, 4)
+
+	def is_free(self, point):
+		"""Checks if the robot centered at the given point is collision free.
+
+		Parameters
+		----------
+		point : tuple
+			Center of the robot.
+
+		Returns
+		-------
+		bool
+		"""
+		if instrumentation.metrics.enabled:
+			instrumentation.metrics.count('is_free')
+
+		x, y = point[0], point[1]
+
+		for left, top, right, bottom in self.boxes:
+			if left < x < right and top < y < bottom:
+				return False
+
+		return True
+
+	def are_free(self, points):
+		"""Checks a batch of robot centers against all the obstacles at once.
+
+		Parameters
+		----------
+		points : array_like
+			Centers of the robot, shape (n, 2).
+
+		Returns
+		-------
+		numpy.ndarray
+			Boolean mask, True where the robot is collision free.
+		"""
+		points = np.asarray(points, dtype=float).reshape(-1, 1, 2)
+		instrumentation.metrics.count('is_free', len(points))
+		low, high = self.bounds[None, :, :2], self.bounds[None, :, 2:]
+		inside = ((low < points) & (points < high)).all(axis=2)
+
+		return ~inside.any(axis=1)
+
+	def cross_obstacle(self, p1, p2):
+		"""Checks if the robot moving from p1 to p2 crosses an obstacle.
+
+		Parameters
+		----------
+		p1 : tuple
+			Initial center of the robot.
+		p2 : tuple
+			End center of the robot.
+
+		Returns
+		-------
+		bool
+		"""
+		if instrumentation.metrics.enabled:
+			instrumentation.metrics.count('cross_obstacle')
+
+		x, y = p1[0], p1[1]
+		dx, dy = p2[0] - x, p2[1] - y
+
+		for left, top, right, bottom in self.boxes:
+			# Parameters of the segment lying inside both slabs, i.e. open intervals
+			if dx == 0:
+				if not left < x < right:
+					continue
+				t_enter, t_exit = -math.inf, math.inf
+			else:
+				t_enter, t_exit = (left - x) / dx, (right - x) / dx
+				if t_enter > t_exit:
+					t_enter, t_exit = t_exit, t_enter
+
+			if dy == 0:
+				if not top < y < bottom:
+					continue
+			else:
+				t1, t2 = (top - y) / dy, (bottom - y) / dy
+				if t1 > t2:
+					t1, t2 = t2, t1
+				t_enter, t_exit = max(t_enter, t1), min(t_exit, t2)
+
+			if t_enter < t_exit and t_enter < 1 and t_exit > 0:
+				return True
+
+		return False
+
+	def cross_obstacles(self, starts, ends):
+		"""Checks a batch of segments against all the obstacles at once.
+
+		Parameters
+		----------
+		starts : array_like
+			Initial centers of the robot, shape (n, 2) or (2,) to share it.
+		ends : array_like
+			End centers of the robot, shape (n, 2).
+
+		Returns
+		-------
+		numpy.ndarray
+			Boolean mask, True where the segment crosses an obstacle.
+		"""
+		starts = np.asarray(starts, dtype=float).reshape(-1, 1, 2)
+		ends = np.asarray(ends, dtype=float).reshape(-1, 1, 2)
+		n = np.broadcast_shapes(starts.shape, ends.shape)[0]
+		instrumentation.metrics.count('cross_obstacle', n)
+
+		if len(self.bounds) == 0 or n == 0:
+			return np.zeros(n, dtype=bool)
+
+		# Segments along the first axis, obstacles along the second one
+		low, high = self.bounds[None, :, :2], self.bounds[None, :, 2:]
+		direction = ends - starts
+		parallel = direction == 0
+
+		with np.errstate(divide='ignore', invalid='ignore'):
+			t1 = (low - starts) / direction
+			t2 = (high - starts) / direction
+
+		# A segment parallel to a slab is either always or never inside of it
+		inside = (low < starts) & (starts < high)
+		t_enter = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+		t_exit = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+		t_enter, t_exit = t_enter.max(axis=2), t_exit.min(axis=2)
+
+		hits = (t_enter < t_exit) & (t_enter < 1) & (t_exit > 0)
+
+		return hits.any(axis=1)
+
+def crosses(starts, ends, bounds):
+	"""Checks pairs of segments and open boxes with the slab method.
+
+	Parameters
+	----------
+	starts : numpy.ndarray
+		Initial points of the segments, shape (k, 2).
+	ends : numpy.ndarray
+		End points of the segments, shape (k, 2).
+	bounds : numpy.ndarray
+		Boxes as (left, top, right, bottom), shape (k, 4).
+
+	Returns
+	-------
+	numpy.ndarray
+		Boolean mask, True where the segment crosses the box.
+	"""
+	low, high = bounds[:, :2], bounds[:, 2:]
+	direction = ends - starts
+	parallel = direction == 0
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		t1 = (low - starts) / direction
+		t2 = (high - starts) / direction
+
+	inside = (low < starts) & (starts < high)
+	t_enter = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2)).max(axis=1)
+	t_exit = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2)).min(axis=1)
+
+	return (t_enter < t_exit) & (t_enter < 1) & (t_exit > 0)
+
+class ShapeCollider():
+	"""
+	Exact collision checks of the robot against polygons and circles.
+
+	Every obstacle is split into triangles, and as for rectangles the robot
+	is the square of half side equal to its radius. The robot swept along a
+	segment is then a convex polygon with sides along both axes and along
+	the segment, tested against each triangle with the separating axis
+	theorem. Triangles are found through a bounding volume hierarchy of
+	their boxes inflated by the radius, traversed for a whole batch of
+	points or segments at once, so each of them only visits a logarithmic
+	number of nodes.
+
+	Attributes
+	----------
+	obstacles : list
+		Obstacles as pygame.Rect, Polygon or Circle.
+	radius : int
+		Robot radius.
+	leaf_size : int
+		Maximum number of triangles in a leaf of the hierarchy.
+	"""
+
+	def __init__(self, obstacles, radius, leaf_size=8):
+		self.radius = radius
+		self.triangles = np.concatenate([shapes.triangles(obstacle) for obstacle in obstacles] +
+			[np.zeros((0, 3, 2))])
+
+		# Inflated triangles as (left, top, right, bottom)
+		self.bounds = np.concatenate((self.triangles.min(axis=1) - radius,
+			self.triangles.max(axis=1) + radius), axis=1)
+
+		# Normals of the sides of each triangle, shape (m, 3, 2)
+		sides = np.roll(self.triangles, -1, axis=1) - self.triangles
+		self.normals = np.stack((-sides[..., 1], sides[..., 0]), axis=2)
+
+		self.build(leaf_size=leaf_size)
+
+	def build(self, leaf_size):
+		"""Builds the hierarchy, splitting the triangles at the median of the widest axis."""
+		centers = (self.bounds[:, :2] + self.bounds[:, 2:]) / 2
+		self.order = np.arange(len(self.triangles))
+		boxes, children, first, count = [], [], [], []
+		stack = [(0, len(self.order), -1, 0)] # (first, end, parent, child)
+
+		while stack:
+			start, end, parent, child = stack.pop()
+			node = len(boxes)
+			ids = self.order[start:end]
+			bounds = self.bounds[ids]
+			boxes.append(np.concatenate((bounds[:, :2].min(axis=0, initial=np.inf),
+				bounds[:, 2:].max(axis=0, initial=-np.inf))))
+			children.append([-1, -1])
+			first.append(start)
+			count.append(end - start)
+
+			if parent >= 0:
+				children[parent][child] = node
+
+			if end - start > leaf_size:
+				axis = np.ptp(centers[ids], axis=0).argmax()
+				half = (end - start) // 2
+				self.order[start:end] = ids[np.argpartition(centers[ids, axis], half)]
+				stack += [(start, start + half, node, 0), (start + half, end, node, 1)]
+
+		self.boxes = np.array(boxes).reshape(-1, 4)
+		self.children = np.array(children).reshape(-1, 2)
+		self.first = np.array(first)
+		self.count = np.array(count)
+
+	def overlap(self, starts, ends, ids):
+		"""Checks pairs of segment and triangle with the separating axis theorem.
+
+		Parameters
+		----------
+		starts : numpy.ndarray
+			Initial centers of the robot, shape (k, 2).
+		ends : numpy.ndarray
+			End centers of the robot, shape (k, 2).
+		ids : numpy.ndarray
+			Triangle of each pair, shape (k,).
+
+		Returns
+		-------
+		numpy.ndarray
+			Boolean mask, True where the robot swept along the segment
+			overlaps the triangle.
+		"""
+		# Axes of the swept robot and of the triangle, shape (k, 6, 2)
+		direction = ends - starts
+		axes = np.concatenate((np.broadcast_to(np.eye(2), (len(ids), 2, 2)),
+			np.stack((-direction[:, 1], direction[:, 0]), axis=1)[:, None],
+			self.normals[ids]), axis=1)
+
+		# Projections of both on each axis
+		projection1 = np.einsum('kad,kd->ka', axes, starts)
+		projection2 = np.einsum('kad,kd->ka', axes, ends)
+		extent = self.radius * np.abs(axes).sum(axis=2)
+		low = np.minimum(projection1, projection2) - extent
+		high = np.maximum(projection1, projection2) + extent
+		vertices = np.einsum('kad,kvd->kav', axes, self.triangles[ids])
+
+		# Degenerate axes, e.g. of a point instead of a segment, separate nothing
+		separated = ((high <= vertices.min(axis=2)) | (vertices.max(axis=2) <= low)) & \
+			(np.abs(axes).sum(axis=2) > 0)
+
+		return ~separated.any(axis=1)
+
+	def collide(self, starts, ends):
+		"""Checks segments against the triangles found through the hierarchy.
+
+		The whole batch descends the hierarchy one level at a time,
+		following the nodes whose box is crossed by each segment. The
+		triangles of the leaves reached are checked on the way, so a
+		segment stops descending as soon as it hits one.
+
+		Parameters
+		----------
+		starts : numpy.ndarray
+			Initial centers of the robot, shape (n, 2).
+		ends : numpy.ndarray
+			End centers of the robot, shape (n, 2).
+
+		Returns
+		-------
+		numpy.ndarray
+			Boolean mask, True where the robot swept along the segment
+			overlaps a triangle.
+		"""
+		hits = np.zeros(len(starts), dtype=bool)
+		queries, nodes = np.arange(len(starts)), np.zeros(len(starts), dtype=int)
+
+		while len(queries) and len(self.triangles):
+			queries, nodes = queries[~hits[queries]], nodes[~hits[queries]]
+			crossed = crosses(starts[queries], ends[queries], self.boxes[nodes])
+			queries, nodes = queries[crossed], nodes[crossed]
+			leaf = self.children[nodes, 0] < 0
+
+			# Triangles of the leaves, filtered by their own box first
+			if leaf.any():
+				counts = self.count[nodes[leaf]]
+				offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+				pairs = np.repeat(queries[leaf], counts)
+				ids = self.order[np.repeat(self.first[nodes[leaf]], counts) + offsets]
+				crossed = crosses(starts[pairs], ends[pairs], self.bounds[ids])
+				pairs, ids = pairs[crossed], ids[crossed]
+				hits[pairs[self.overlap(starts[pairs], ends[pairs], ids)]] = True
+
+			queries = np.repeat(queries[~leaf], 2)
+			nodes = self.children[nodes[~leaf]].ravel()
+
+		return hits
+
+	def is_free(self, point):
+		"""Checks if the robot centered at the given point is collision free.
+
+		Parameters
+		----------
+		point : tuple
+			Center of the robot.
+
+		Returns
+		-------
+		bool
+		"""
+		return bool(self.are_free(points=[point])[0])
+
+	def are_free(self, points):
+		"""Checks a batch of robot centers in a single traversal.
+
+		Parameters
+		----------
+		points : array_like
+			Centers of the robot, shape (n, 2).
+
+		Returns
+		-------
+		numpy.ndarray
+			Boolean mask, True where the robot is collision free.
+		"""
+		points = np.asarray(points, dtype=float).reshape(-1, 2)
+		instrumentation.metrics.count('is_free', len(points))
+
+		return ~self.collide(starts=points, ends=points)
+
+	def cross_obstacle(self, p1, p2):
+		"""Checks if the robot moving from p1 to p2 crosses an obstacle.
+
+		Parameters
+		----------
+		p1 : tuple
+			Initial center of the robot.
+		p2 : tuple
+			End center of the robot.
+
+		Returns
+		-------
+		bool
+		"""
+		return bool(self.cross_obstacles(starts=p1, ends=[p2])[0])
+
+	def cross_obstacles(self, starts, ends):
+		"""Checks a batch of segments in a single traversal.
+
+		Parameters
+		----------
+		starts : array_like
+			Initial centers of the robot, shape (n, 2) or (2,) to share it.
+		ends : array_like
+			End centers of the robot, shape (n, 2).
+
+		Returns
+		-------
+		numpy.ndarray
+			Boolean mask, True where the segment crosses an obstacle.
+		"""
+		starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+		ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+		starts, ends = np.broadcast_arrays(starts, ends)
+		instrumentation.metrics.count('cross_obstacle', len(starts))
+
+		return self.collide(starts=starts, ends=ends)
@@ -1,4 +1,5 @@
 import pygame
+import shapes
 
 class Environment():
 	"""
@@ -8,9 +9,11 @@ class Environment():
 	----------
 	dimensions : tuple
 		The X and Y window dimensions.
+	headless : bool
+		Skips opening the window, so only the obstacles are available.
 	"""
 	
-	def __init__(self, map_dimensions):
+	def __init__(self, map_dimensions, headless=False):
 		# Colors 
 		self.WHITE = (255, 255, 255)
 		self.BLACK = (0, 0, 0)
@@ -26,11 +29,19 @@ class Environment():
 
 		# Window settings
 		self.FPS = 120
+		self.map = None
+		self.font = None
+
+		self.obstacles = []
+		self.sides = []
+		self.background = None
+
+		if headless:
+			return
+
 		pygame.display.set_caption('Visibility-based PRM')
 		self.map = pygame.display.set_mode(size=(self.WIDTH, self.HEIGHT))
 		self.map.fill(self.WHITE)
-
-		self.obstacles = []
 		
 		# Font and a counter for the number of the node
 		self.font = pygame.font.SysFont('Comic Sans MS', 30)	
@@ -93,19 +104,61 @@ class Environment():
 		self.obstacles.append(obstacle1)
 		self.obstacles.append(obstacle2)
 
+		# Sides of every obstacle, built once instead of on every frame
+		self.sides = [side for obstacle in self.obstacles for side in obstacle]
+
+		return self.obstacles
+
+	def load_obstacles(self, path):
+		"""Loads the obstacles of a map description instead of the default ones.
+
+		Parameters
+		----------
+		path : str
+			JSON file describing rectangles, polygons and circles.
+
+		Returns
+		-------
+		list
+			A collection of obstacles, each with a single side.
+		"""
+		self.sides = shapes.load(path)
+		self.obstacles = [[side] for side in self.sides]
+
 		return self.obstacles
 
-	def draw_obstacles(self):
-		"""Draws each side of the obstacles."""
-		obstacles = []
+	def load_map(self, grid_map):
+		"""Draws the blocked cells of an occupancy map once, as the background of the obstacles.
+
+		Parameters
+		----------
+		grid_map : GridMap
+			Occupancy map, read a block of rows at a time.
+		"""
+		self.background = pygame.Surface(size=(grid_map.WIDTH, grid_map.HEIGHT))
+		self.background.fill(self.WHITE)
+		pixels = pygame.surfarray.pixels3d(self.background)
+
+		# Surface arrays are indexed by X first
+		for top in range(0, grid_map.HEIGHT, 1024):
+			pixels[:, top:top+1024][grid_map.rows(top, top + 1024).T] = self.GRAY
+
+		del pixels
+
+	def draw_obstacles(self, map_=None):
+		"""Draws each side of the obstacles, on the given surface or else on the map."""
+		map_ = self.map if map_ is None else map_
+
+		if self.background is not None:
+			map_.blit(self.background, (0, 0))
 
-		for obstacle in self.obstacles:
-			for side in obstacle:
-				pygame.draw.rect(surface=self.map, color=self.GRAY,
-					rect=side)
-				obstacles.append(side)
+		for side in self.sides:
+			if isinstance(side, pygame.Rect):
+				pygame.draw.rect(surface=map_, color=self.GRAY, rect=side)
+			else:
+				side.draw(map_=map_, color=self.GRAY)
 
-		return obstacles				
+		return self.sides				
 
 	def draw_node_number(self, number, point):
 		"""Draws a number next to the node."""
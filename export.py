@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import numpy as np
+import pygame
+import environment
+import instrumentation
+import renderer
+
+# Renderer and frame array of each worker process
+_renderer = None
+_frames = None
+
+def initialize(map_dimensions, sides, graph, events, options):
+	"""Rebuilds the renderer of the main process within the worker process.
+
+	The worker draws on a display of the dummy video driver, so no window
+	is opened.
+	"""
+	global _renderer
+	os.environ['SDL_VIDEODRIVER'] = 'dummy'
+	pygame.init()
+
+	environment_ = environment.Environment(map_dimensions=map_dimensions)
+	environment_.sides = sides
+
+	if graph.grid_map is not None:
+		environment_.load_map(graph.grid_map)
+
+	_renderer = renderer.Renderer(environment=environment_, graph=graph, **options)
+	_renderer.events = events
+
+def save(number, output):
+	"""Writes the map as the frame with the given number."""
+	global _frames
+	map_ = _renderer.environment.map
+
+	if output.endswith('.npy'):
+		if _frames is None or _frames.filename != os.path.abspath(output):
+			_frames = np.load(output, mmap_mode='r+')
+		_frames[number] = pygame.surfarray.pixels3d(map_).swapaxes(0, 1)
+	else:
+		pygame.image.save(map_, os.path.join(output, f'frame_{number:06d}.png'))
+
+def render(kind, frames, output, keep_roadmap):
+	"""Draws and writes a run of consecutive frames of the same kind.
+
+	Parameters
+	----------
+	kind : str
+		Either 'construction', 'roadmap', 'trajectory' or 'path'.
+	frames : list
+		Number of each frame, with the number of events drawn on it for
+		the construction, or the position of the robot for the trajectory.
+	output : str
+		Directory of the PNG images, or file of the frame array if ending
+		with .npy.
+	keep_roadmap : bool
+		Draws the roadmap behind the robot.
+	"""
+	environment_, graph = _renderer.environment, _renderer.graph
+	map_ = environment_.map
+
+	if kind in ('construction', 'roadmap'):
+		map_.fill(graph.WHITE)
+		environment_.draw_obstacles()
+	else:
+		layer = _renderer.layer(keep_roadmap=keep_roadmap)
+		map_.blit(layer, (0, 0))
+
+	# Each frame only adds to the previous one, as in the display
+	drawn, previous = 0, None
+
+	for number, item in frames:
+		if kind == 'construction':
+			_renderer.draw(start=drawn, stop=item)
+			drawn = item
+		elif kind == 'roadmap':
+			_renderer.draw()
+			graph.draw_roadmap(map_=map_)
+		elif kind == 'trajectory':
+			if previous is not None:
+				map_.blit(layer, previous, area=previous)
+			previous = graph.move_robot(position=item, map_=map_)
+		else:
+			graph.draw_path_to_goal(map_=map_)
+
+		save(number=number, output=output)
+
+def export(renderer_, output, keep_roadmap, workers=1):
+	"""Renders the construction and the animation of the robot as frames.
+
+	Every frame shown by the display is drawn off-screen without waiting
+	between them: one per event of the construction that draws anything,
+	the finished roadmap, one per position of the robot, and its path.
+	Runs of consecutive frames are split among the worker processes,
+	which rebuild the same drawings from the recorded events.
+
+	Parameters
+	----------
+	renderer_ : Renderer
+		Renderer holding the events of the construction, and the graph
+		with the path to animate.
+	output : str
+		Directory where the frames are written as PNG images, or file
+		where they are written as an array of shape (n, height, width, 3)
+		if ending with .npy.
+	keep_roadmap : bool
+		Draws the roadmap behind the robot.
+	workers : int
+		Number of processes rendering the frames.
+
+	Returns
+	-------
+	int
+		Number of frames written.
+	"""
+	global _renderer, _frames
+	graph = renderer_.graph
+	shows_rejected = renderer_.show_random_nodes or renderer_.show_rejected_nodes
+	stops = [stop for stop, (event, _, _) in enumerate(renderer_.events, start=1)
+		if event != 'rejected' or shows_rejected]
+	kinds = [('construction', stops), ('roadmap', [None]), ('trajectory', graph.smooth),
+		('path', [None])]
+
+	# Frames are numbered in order, and each kind is split in runs per worker
+	tasks, number = [], 0
+	for kind, items in kinds:
+		numbered = list(enumerate(items, start=number))
+		number += len(items)
+		size = -(-len(numbered) // workers)
+
+		tasks += [(kind, numbered[i:i+size], output, keep_roadmap)
+			for i in range(0, len(numbered), size)]
+
+	if output.endswith('.npy'):
+		width, height = renderer_.environment.map.get_size()
+		np.lib.format.open_memmap(output, mode='w+', dtype=np.uint8,
+			shape=(number, height, width, 3)).flush()
+	else:
+		os.makedirs(output, exist_ok=True)
+
+	with instrumentation.metrics.timer('export'):
+		if workers > 1:
+			options = {'show_random_nodes': renderer_.show_random_nodes,
+				'show_rejected_nodes': renderer_.show_rejected_nodes,
+				'show_enumerated_nodes': renderer_.show_enumerated_nodes}
+
+			# Forked workers would inherit the video driver state of this process
+			pool = multiprocessing.get_context('spawn').Pool(processes=workers,
+				initializer=initialize, initargs=(renderer_.environment.map.get_size(),
+				renderer_.environment.sides, graph, renderer_.events, options))
+
+			# Workers are not terminated, as SDL turns SIGTERM into a quit event
+			try:
+				pool.starmap(render, tasks)
+			finally:
+				pool.close()
+				pool.join()
+		else:
+			_renderer = renderer_
+
+			for task in tasks:
+				render(*task)
+
+			# Writes the frames left in the array of this process
+			_frames = None
+
+	return number
@@ -1,8 +1,12 @@
 import pygame
-import random
 import math
 import numpy as np
-import queue
+import heapq
+import collision
+import occupancy_grid
+import spatial_index
+import roadmap
+import instrumentation
 
 class Graph():
 	"""
@@ -16,17 +20,32 @@ class Graph():
 		End position of the graph in X and Y respectively.
 	map_dimensions : tuple
 		Map width and height in pixels.
+	radius : int
+		Robot radius.
+	occupancy_grid : bool
+		Check collisions in a precomputed raster instead of the exact
+		rectangle test.
+	grid_map : GridMap
+		Occupancy map checked in a raster along with the obstacles, None
+		for none.
 	"""
 
-	def __init__(self, start, goal, map_dimensions, radius):
+	def __init__(self, start, goal, map_dimensions, radius, occupancy_grid=False, grid_map=None):
 		self.x_init = start
 		self.x_goal = goal
 		self.robot_radius = radius
+		self.occupancy_grid = occupancy_grid
+		self.grid_map = grid_map
 
 		self.WIDTH, self.HEIGHT = map_dimensions
-		self.neighbors = {}
+		self.roadmap = roadmap.Roadmap()
+		self.index = spatial_index.SpatialIndex(cell_size=max(4*radius, 1))
+		self.edge_index = spatial_index.EdgeIndex(cell_size=max(4*radius, 1))
 
-		self.obstacles = None
+		# Connected components of the roadmap, when known
+		self.components = None
+
+		self.obstacles = []
 		self.smooth_path = []
 		self.is_first_query = False
 
@@ -41,72 +60,94 @@ class Graph():
 		self.TURQUOISE = (64, 224, 208)
 		self.FUCSIA = (255, 0, 255)
 
-	def is_free(self, point, obstacles):
-		"""Checks if a configuration is colliding with an obstacle.
-
-		When dealing with obstacles it is necessary to check 
-		for the collision with them from the generated node.
+	@property
+	def obstacles(self):
+		"""Obstacles the roadmap is checked against."""
+		return self._obstacles
+
+	@obstacles.setter
+	def obstacles(self, obstacles):
+		self._obstacles = obstacles
+
+		# Rectangles are solved exactly on their own, any other shape through the hierarchy
+		if self.occupancy_grid or self.grid_map is not None:
+			self.collider = occupancy_grid.OccupancyGrid(obstacles=obstacles,
+				radius=self.robot_radius, map_dimensions=(self.WIDTH, self.HEIGHT),
+				grid_map=self.grid_map)
+		elif all(isinstance(obstacle, pygame.Rect) for obstacle in obstacles):
+			self.collider = collision.RectangleCollider(obstacles=obstacles, 
+				radius=self.robot_radius)
+		else:
+			self.collider = collision.ShapeCollider(obstacles=obstacles,
+				radius=self.robot_radius)
+
+	def make_node(self, center):
+		"""Rectangle occupied by the robot centered at the given point.
 
 		Parameters
 		----------
-		point : tuple
-			Point to be checked.
-		obstacles : pygame.Rect
-			Rectangle obstacle.
+		center : tuple
+			Center of the robot in X and Y respectively.
 
 		Returns
 		-------
-		bool
+		pygame.Rect
+			Configuration of the robot.
 		"""
-		for obstacle in obstacles:
-			if obstacle.colliderect(point):
-				return False
-
-		return True
+		left = center[0] - self.robot_radius
+		top = center[1] - self.robot_radius
+		width = 2*self.robot_radius
+		height = width
 
-	def generate_random_node(self):
-		"""Generates a random node on the screen.
+		return pygame.Rect(left, top, width, height)
 
-		The x and y coordinate is generated given an uniform
-		distribution of the size of the screen width and height.
+	def add_node(self, center, node_type):
+		"""Adds a node to the roadmap and to the spatial index.
 
 		Parameters
 		----------
-		None
+		center : tuple
+			Position of the node in X and Y respectively.
+		node_type : roadmap.NodeType
+			Role of the node.
 
 		Returns
 		-------
-		tuple
-			Coordinates of the random node. 
+		int
+			Identifier of the node.
 		"""
-		x, y = random.uniform(0, self.WIDTH), random.uniform(0, self.HEIGHT)
-		x_rand = int(x), int(y) # To use within the class
-
-		# Rectangle generated around the generated random node
-		left = x_rand[0] - self.robot_radius
-		top = x_rand[1] - self.robot_radius
-		width = 2*self.robot_radius
-		height = width
-		self.x_rand = pygame.Rect(left, top, width, height)
+		id_ = self.roadmap.add_node(point=center, node_type=node_type)
+		self.index.insert(point=center, item=id_)
 
-		return self.x_rand
+		return id_
 
-	def euclidean_distance(self, p1, p2):
-		"""Euclidean distance between two points.
+	def add_edge(self, node1, node2, valid=None):
+		"""Links two nodes of the roadmap given their identifiers.
 
 		Parameters
 		----------
-		p1 : int
-			Start point.
-		p2 : int 
-			End point.
+		node1 : int
+			Identifier of the first node.
+		node2 : int
+			Identifier of the second node.
+		valid : bool
+			Whether the local path between both nodes is collision free,
+			checked against the obstacles if not given.
 
 		Returns
 		-------
-		float
-			Euclidean distance metric.
+		int
+			Identifier of the edge.
 		"""
-		return int(math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2))
+		p1, p2 = self.roadmap.center(node1), self.roadmap.center(node2)
+
+		if valid is None:
+			valid = not self.collider.cross_obstacle(p1=p1, p2=p2)
+
+		id_ = self.roadmap.add_edge(node1=node1, node2=node2, valid=valid)
+		self.edge_index.insert(p1=p1, p2=p2, item=id_)
+
+		return id_
 
 	def k_nearest(self, graph, x_rand, configuration, k=2):
 		"""Given k, it returns the k-nearest neighbors of x_rand.
@@ -116,7 +157,9 @@ class Graph():
 		Parameters
 		----------
 		graph : list
-			Graph containing all the coordinate nodes.
+			Graph containing all the coordinate nodes. If None, the nodes
+			of the roadmap are searched instead, and linked to the
+			configuration when it is a node of the roadmap too.
 		x_rand : tuple 
 			Coordinate of the random node generated.
 		configuration : tuple
@@ -129,44 +172,127 @@ class Graph():
 		tuple
 			Nearest node to the random node generated.	
 		"""
-		# Get only the coordinates of the rects of the generated random nodes
-		graph_ = [coordinate.center for coordinate in graph]
-		x_rand = x_rand.center
-		configuration = configuration.center
+		if graph is not None:
+			nearest = spatial_index.k_smallest(points=[node.center for node in graph],
+				point=x_rand.center, k=k)
+			return [graph[i] for i in nearest]
 
-		distances = []
-		near = []
-		near_configurations = [] # Same as near variable but for rectangles
+		nearest = [self.index.items[i] for i in self.index.nearest(point=x_rand.center, k=k)]
+		id_ = self.roadmap.find(point=configuration.center)
 
-		for state in graph_:
-			distance = self.euclidean_distance(state, x_rand)
-			distances.append(distance)
+		if id_ is not None:
+			for neighbor in nearest:
+				if neighbor != id_:
+					self.add_edge(node1=id_, node2=neighbor)
 
-		# Index of the minimum distance to the generated random node
-		self.min_distance = np.argmin(distances) 
-		x_near = graph_[self.min_distance]
+		return [self.roadmap.node(neighbor) for neighbor in nearest]
 
-		# Indices of the k-smallest distances 
-		self.distances = np.asarray(distances.copy())
-		self.min_distances = np.argpartition(distances, k)
+	def nearest_visible(self, point):
+		"""Nearest node of the roadmap seen from the point.
 
-		# Get the k-smallest values from the graph
-		for i in range(k):
-			k_smallest = graph_[self.min_distances[i]]
-			near.append(k_smallest)
-			for node in graph:
-				if node.center == k_smallest:
-					near_configurations.append(node)
+		The nodes are fetched from the spatial index in growing batches
+		sorted by distance, and each batch is checked at once.
 
-		self.neighbors.update({configuration: near})
+		Parameters
+		----------
+		point : tuple
+			Position to connect in X and Y respectively.
+
+		Returns
+		-------
+		int
+			Identifier of the nearest visible node, None if no node is visible.
+		"""
+		k, checked = 8, 0
+
+		while checked < len(self.index):
+			ids = self.index.nearest(point=point, k=k)[checked:]
+			checked += len(ids)
+			k *= 2
 
-		return near_configurations
+			centers = self.index.points[ids]
+			same = (centers == point).all(axis=1)
+			blocked = self.collider.cross_obstacles(starts=point, ends=centers)
+			visible = ~(same | blocked)
 
-	def interpolation(self, p1, p2):
+			if visible.any():
+				return self.index.items[ids[visible.argmax()]]
+
+		return None
+
+	def nearest_visible_edge(self, point):
+		"""Nearest point of a valid edge of the roadmap seen from the point.
+
+		Parameters
+		----------
+		point : tuple
+			Position to connect in X and Y respectively.
+
+		Returns
+		-------
+		tuple
+			Identifier of the edge and its closest point to the given one,
+			None if no edge is visible.
+		"""
+		k, checked = 8, 0
+
+		while checked < len(self.edge_index):
+			ids = self.edge_index.nearest(point=point, k=k)[checked:]
+			checked += len(ids)
+			k *= 2
+
+			ids = ids[self.roadmap.valid[ids]]
+			closest = spatial_index.segment_distances(self.edge_index.segments[ids], point)[1]
+			closest = np.rint(closest).astype(int)
+			visible = ~self.collider.cross_obstacles(starts=point, ends=closest)
+
+			if visible.any():
+				i = visible.argmax()
+				return int(ids[i]), tuple(closest[i].tolist())
+
+		return None
+
+	def entry(self, point):
+		"""Way into the roadmap from the point.
+
+		The nearest visible node is preferred, otherwise the point is
+		attached to the nearest visible edge and enters the roadmap through
+		its closest end.
+
+		Parameters
+		----------
+		point : tuple
+			Position to connect in X and Y respectively.
+
+		Returns
+		-------
+		tuple
+			Positions between the point and the node, and the identifier of
+			the node, None if neither a node nor an edge is visible.
+		"""
+		node = self.nearest_visible(point=point)
+
+		if node is not None:
+			return [], node
+
+		attached = self.nearest_visible_edge(point=point)
+
+		if attached is None:
+			return None
+
+		edge, closest = attached
+		node1, node2 = self.roadmap.edges[edge].tolist()
+		node = min(node1, node2, key=lambda id_: math.dist(closest, self.roadmap.center(id_)))
+
+		return [closest], node
+
+	def interpolation(self, p1, p2, step=5):
 		"""Interpolates a line.
 
 		Given an ordered pair of initial point p1 and an
-		end point p2, it computes points between p1 and p2.
+		end point p2, it computes points between p1 and p2,
+		about step pixels apart, so the robot moves at the same
+		speed along short and long segments.
 
 		Parameters
 		----------
@@ -174,6 +300,8 @@ class Graph():
 			Initial point.
 		p2 : tuple
 			End point.
+		step : float
+			Distance in pixels between consecutive points.
 
 		Returns
 		-------
@@ -183,133 +311,111 @@ class Graph():
 		p11, p12 = p1[0], p1[1]
 		p21, p22 = p2[0], p2[1]
 		coordinates = []
+		steps = max(math.ceil(math.dist(p1, p2) / step), 1)
+		instrumentation.metrics.count('interpolation_steps', steps+1)
 
-		for i in range(0, 21):
-			u = i / 20
+		for i in range(0, steps+1):
+			u = i / steps
 			x = p11 * u + p21 * (1 - u)
 			y = p12 * u + p22 * (1 - u)
 			coordinates.append((x, y))
 
 		return coordinates
 
-	def cross_obstacle(self, configuration1, configuration2, map_):
-		"""Checks if a set of configurations crosses an obstacle.
+	def a_star(self, start, end, map_=None):
+		"""A* algorithm.
 
-		Given two configurations configuration1, configuration2
-		an interpolation between such two configurations is done
-		to check if any of the points in between lie on the obstacle.
+		A* algorithm for pathfinding in the graph. The path found is kept
+		to animate the robot along it.
 
-		Parameters
-		----------
-		configuration1 : tuple 
-			Initial configuration.
-		configuration2 : tuple 
-			End configuration.
+		start : int
+			Start node.
+		end : int
+			End node.
 		map_ : pygame.Surface
 			Environment to draw on.
 
 		Returns
 		-------
 		bool
-		"""
-		obs = self.obstacles.copy()
-
-		# Get the rectangle center 
-		configuration1_ = configuration1.center
-		configuration2_ = configuration2.center
-		
-		configuration11, configuration12 = configuration1_[0], configuration1_[1]
-		configuration21, configuration22 = configuration2_[0], configuration2_[1]
-
-		while len(obs) > 0:
-			rectangle = obs.pop(0)
-			# Interpolation
-			for i in range(0, 101):
-				u = i / 100
-				x = configuration11 * u + configuration21 * (1 - u)
-				y = configuration12 * u + configuration22 * (1 - u)
+			True if a path was found.
+		"""		
+		with instrumentation.metrics.timer('a_star'):
+			path = self.shortest_path(start=start, end=end)
 
-				# Copy and reposition the center
-				configuration2_copy = configuration2.copy()
-				configuration2_copy.center = (x, y)
+		if path is None:
+			return False
 
-				if rectangle.colliderect(configuration2_copy):
-					return True
+		self.path_coordinates = [self.roadmap.center(id_) for id_ in path[::-1]]
+		self.generate_smooth_path()
 
-		return False
+		return True
 
-	def a_star(self, start=(50, 50), end=(540, 380), nodes=None, map_=None):
-		"""A* algorithm.
+	def shortest_path(self, start, end):
+		"""Shortest path between two nodes of the roadmap.
 
-		A* algorithm for pathfinding in the graph.
+		Edges were validated when inserted into the roadmap, so only the
+		edges still marked as valid are followed, without checking them
+		against the obstacles. Neither the roadmap nor the graph are
+		modified, so it can answer any number of queries.
 
-		start : tuple
+		Parameters
+		----------
+		start : int
 			Start node.
-		end : tuple
+		end : int
 			End node.
-		nodes : list
-			Collection of nodes in the graph.
-		map_ : pygame.Surface
-			Environment to draw on.
-		"""		
-		open_set = queue.PriorityQueue()
-		open_set.put((0, self.x_init)) # (f-score, start)
+
+		Returns
+		-------
+		list
+			Identifiers of the nodes from start to end, None if there is no path.
+		"""
+		indptr, indices, edge_ids = self.roadmap.adjacency()
+		lengths, valid = self.roadmap.lengths, self.roadmap.valid
+		goal = self.roadmap.center(end)
+
+		open_set = [(self.heuristic(self.roadmap.center(start), goal), start)] # (f-score, node)
 		came_from = {}
+		g_score = {start: 0}
+		closed_set = set()
+
+		while open_set: 
+			current = heapq.heappop(open_set)[1]
+
+			# Outdated entries are skipped instead of removed from the heap
+			if current in closed_set:
+				continue
+
+			if current == end:
+				return self.reconstruct_path(came_from, current)
+
+			closed_set.add(current)
+			first, last = indptr[current], indptr[current+1]
+
+			for neighbor, edge in zip(indices[first:last].tolist(), edge_ids[first:last].tolist()):
+				if not valid[edge] or neighbor in closed_set:
+					continue
 
-		# Initialize to infinity all g-score and f-score nodes but the start 
-		g_score = {node.center: float('inf') for node in nodes}
-		g_score[self.x_init] = 0
-		f_score = {node.center: float('inf') for node in nodes}
-		f_score[self.x_init] = self.heuristic(self.x_init, self.x_goal)
-		open_set_hash = {self.x_init}
-
-		while not open_set.empty(): 
-			current = open_set.get()[1]
-
-			open_set_hash.remove(current)
-			# Get the correspondant rectangle of the center point for the current configuration
-			for node in nodes:
-				if node.center == current:
-					current_ = node
-
-			if current == self.x_goal:
-				self.reconstruct_path(came_from, current, map_)
-				return True
-			
-			try:
-				# k-nearest
-				for neighbor in self.neighbors[current]:
-					# Get the correspondant rectangle of the center point for the
-					# k-nearest neighbor configuration
-					for node in nodes:
-						if node.center == neighbor:
-							neighbor_ = node
-
-					temp_g_score = g_score[current] + self.euclidean_distance(current, neighbor)
-					cross_obstacle = self.cross_obstacle(configuration1=current_,
-						configuration2=neighbor_, map_=map_)
-
-					if temp_g_score < g_score[neighbor] and not cross_obstacle:
-						came_from[neighbor] = current
-						g_score[neighbor] = temp_g_score
-						f_score[neighbor] = temp_g_score + self.heuristic(neighbor, end)
-
-						if neighbor not in open_set_hash:
-							open_set.put((f_score[neighbor], neighbor))
-							open_set_hash.add(neighbor)
-			except KeyError as error:
-				raise KeyError('Roadmap not sufficiently connected. Try increasing the maximum number of failures. e.g. python3 visibility_prm.py --obstacles -M 30')
-
-	def reconstruct_path(self, came_from, current, map_):
+				temp_g_score = g_score[current] + lengths[edge]
+
+				if temp_g_score < g_score.get(neighbor, float('inf')):
+					came_from[neighbor] = current
+					g_score[neighbor] = temp_g_score
+					f_score = temp_g_score + self.heuristic(self.roadmap.center(neighbor), goal)
+					heapq.heappush(open_set, (f_score, neighbor))
+
+		return None
+
+	def reconstruct_path(self, came_from, current):
 		"""Reconstruct the path from point A to B."""
-		self.path_coordinates = []
-		self.path_coordinates.append(self.x_goal)
+		path = [current]
 
 		while current in came_from:
 			current = came_from[current]
-			self.path_coordinates.append(current)
+			path.append(current)
 
-		self.generate_smooth_path()
+		return path[::-1]
 
 	def generate_smooth_path(self):
 		"""Sections the path the pieces by interpolating."""
@@ -318,31 +424,24 @@ class Graph():
 				p2=self.path_coordinates[i+1])
 			self.smooth_path.append(interpolation)
 
-		# Flat smooth path list
-		self.smooth = [coord for coords in self.smooth_path[::-1] for coord in coords]
+		# Flat smooth path list, without repeating the point shared by consecutive pieces
+		self.smooth = [coord for i, coords in enumerate(self.smooth_path[::-1])
+			for coord in (coords[1:] if i else coords)]
 		self.smooth_path = []
 	
-	def draw_path_to_goal(self, environment, obstacles):	    
+	def draw_path_to_goal(self, map_):
 		"""Draws the path from the x_goal node to the x_init node."""
-		self.draw_initial_node(map_=environment.map) 
-		self.draw_goal_node(map_=environment.map)
-
-		if obstacles != []:
-			environment.draw_obstacles()
-
 		for i in range(len(self.path_coordinates)-1):
-			pygame.draw.line(surface=environment.map, color=self.RED,
+			pygame.draw.line(surface=map_, color=self.RED,
 			 	start_pos=self.path_coordinates[i], end_pos=self.path_coordinates[i+1], width=4)
 
-		self.refresh_screen(map_=environment.map, seconds=3)
-
 	def heuristic(self, p1, p2):
 		"""Heuristic distance from point to point."""
-		return self.euclidean_distance(p1, p2)
+		return math.dist(p1, p2)
 
-	def draw_random_node(self, map_):
-		"""Draws the x_rand node."""
-		pygame.draw.circle(surface=map_, color=self.GREEN, center=self.x_rand.center, 
+	def draw_random_node(self, map_, position):
+		"""Draws the random node at the given position."""
+		pygame.draw.circle(surface=map_, color=self.GREEN, center=position, 
 			radius=self.robot_radius, width=0)
 
 	def draw_initial_node(self, map_):
@@ -378,18 +477,29 @@ class Graph():
 			pygame.draw.line(surface=map_, color=self.BLACK, start_pos=p1, end_pos=p2)
 
 	def move_robot(self, position, map_):
-		"""Draws the robot moving at the given position."""
-		pygame.draw.circle(surface=map_, color=(0, 0, 255),	center=position, 
+		"""Draws the robot moving at the given position, returning the area drawn."""
+		return pygame.draw.circle(surface=map_, color=(0, 0, 255),	center=position, 
 			radius=self.robot_radius)
 
-	def draw_roadmap(self, map_):
-		"""Draws the roadmap constantly. Used to display it in an infinite loop."""
+	def draw_roadmap(self, map_, viewport=None):
+		"""Draws the roadmap constantly. Used to display it in an infinite loop.
+
+		Only the valid edges are drawn, and only those crossing the
+		viewport when given as a pygame.Rect.
+		"""
 		self.draw_initial_node(map_=map_)
 		self.draw_goal_node(map_=map_)
 
-		for node, neighbors in self.neighbors.items():
-			for neighbor in neighbors:
-				self.draw_local_planner(p1=node, p2=neighbor, map_=map_)
+		if viewport is None:
+			ids = np.flatnonzero(self.roadmap.valid[:self.roadmap.n_edges])
+		else:
+			ids = self.edge_index.crossing(box=(viewport.left, viewport.top, viewport.right,
+				viewport.bottom))
+			ids = ids[self.roadmap.valid[ids]]
+
+		for node1, node2 in self.roadmap.edges[ids].tolist():
+			self.draw_local_planner(p1=self.roadmap.center(node1), p2=self.roadmap.center(node2),
+				map_=map_)
 
 	def refresh_screen(self, map_, seconds):
 		"""Updates the screen information and waits the given seconds."""
@@ -400,71 +510,100 @@ class Graph():
 		pygame.time.delay(seconds)
 		map_.fill(self.WHITE)
 
-	def draw_trajectory(self, configurations, environment, obstacles, keep_roadmap):
-		"""Draws the robot moving in the map."""
-		for i in range(len(self.smooth)):
-			robot_position = self.smooth[i]
+	def follow(self, path):
+		"""Keeps the path to animate the robot along it.
 
-			if obstacles != []:
-				environment.draw_obstacles()
+		Parameters
+		----------
+		path : list
+			Positions from the initial to the goal configuration.
+		"""
+		self.x_init, self.x_goal = path[0], path[-1]
+		self.path_coordinates = path[::-1]
+		self.generate_smooth_path()
 
-			if keep_roadmap:
-				self.draw_roadmap(map_=environment.map)
+	def find_path(self, init, goal):
+		"""Path between two configurations along the roadmap.
 
-			# Draw inital and final robot configuration constantly
-			self.draw_initial_node(map_=environment.map)
-			self.draw_goal_node(map_=environment.map)
+		Both configurations are connected to their nearest visible node,
+		or to their nearest visible edge when they see no node, only for
+		the search, so the roadmap is left untouched. When those
+		nodes are not connected, any pair of visible nodes of a common
+		component is tried instead.
 
-			# Draw path to goal, and the robot movement constantly
-			self.move_robot(position=robot_position, map_=environment.map)
-			self.refresh_screen(map_=environment.map, seconds=0.02)
+		Parameters
+		----------
+		init : tuple
+			Initial configuration.
+		goal : tuple
+			End configuration.
 
-	def query(self, init, goal, configurations, map_):
-		"""Adds the initial and goal configurations to the roadmap.
+		Returns
+		-------
+		list
+			Positions from init to goal, None if there is no path.
+		"""
+		init, goal = tuple(init), tuple(goal)
+
+		# Both configurations may see each other straight away
+		if not self.collider.cross_obstacle(p1=init, p2=goal):
+			return [init, goal]
+
+		init_entry, goal_entry = self.entry(point=init), self.entry(point=goal)
+		path = None
+
+		if init_entry is not None and goal_entry is not None:
+			with instrumentation.metrics.timer('a_star'):
+				path = self.shortest_path(start=init_entry[1], end=goal_entry[1])
+
+		if path is not None:
+			return [init] + init_entry[0] + [self.roadmap.center(id_) for id_ in path] + \
+				goal_entry[0] + [goal]
+
+		# The nearest nodes may be apart while farther ones are connected
+		if self.components is None:
+			return None
+
+		anchors = roadmap.Anchors(roadmap=self.roadmap, components=self.components,
+			collider=self.collider, start=init, goal=goal)
+
+		return anchors.path(graph=self) if anchors.joined() else None
+
+	def query(self, init, goal, map_=None):
+		"""Finds the path between the initial and goal configurations.
 
 		Given the initial and goal configurations, it searches in the 
 		roadmap the nearest and checks whether it can be connected or 
 		not. If the connection is not possible, the next nearest node
-		is checked.
+		is checked. The path found is kept to animate the robot along it.
 
 		Parameters
 		----------
-		initial : tuple
+		init : tuple
 			Initial configuration.
 		goal : tuple
 			End configuration.
+		map_ : pygame.Surface
+			Environment to draw on, None to skip drawing.
 
 		Returns
 		-------
-		None
+		list
+			Positions from init to goal, None if there is no path.
 		"""
-		initial_distances = [(self.euclidean_distance(p1=init.center, \
-			p2=configurations[i].center), configurations[i]) for i in range(len(configurations)) \
-			if configurations[i].center != init.center]
-		goal_distances = [(self.euclidean_distance(p1=goal.center, 
-			p2=configurations[i].center), configurations[i]) for i in range(len(configurations)) \
-			if configurations[i].center != goal.center]
-		initial_sorted_distances = sorted(initial_distances)
-		goal_sorted_distances = sorted(goal_distances)
-
-		for i in range(len(initial_sorted_distances)-1):
-			cross_obstacle = self.cross_obstacle(configuration1=init, 
-				configuration2=initial_sorted_distances[i][1], map_=map_)
-			if not cross_obstacle:
-				# Add the neighbor of the initial node
-				self.neighbors.update({init.center: [initial_sorted_distances[i][1].center]})
-				self.draw_local_planner(p1=init, p2=initial_sorted_distances[i][1], map_=map_)
-				break
-
-		for i in range(len(goal_sorted_distances)-1):
-			cross_obstacle = self.cross_obstacle(configuration1=goal, 
-				configuration2=goal_sorted_distances[i][1], map_=map_)
-			if not cross_obstacle:
-				# Add the neighbor of the goal node
-				self.neighbors.update({goal_sorted_distances[i][1].center: [goal.center]})
-				self.draw_local_planner(p1=goal, p2=goal_sorted_distances[i][1], map_=map_)
-				break
-
-		if not self.is_first_query:
-			self.refresh_screen(map_=map_, seconds=2)
-			self.is_first_query = True
\ No newline at end of file
+		path = self.find_path(init=init, goal=goal)
+
+		if path is None:
+			return None
+
+		self.follow(path=path)
+
+		if map_ is not None:
+			self.draw_local_planner(p1=path[0], p2=path[1], map_=map_)
+			self.draw_local_planner(p1=path[-2], p2=path[-1], map_=map_)
+
+			if not self.is_first_query:
+				self.refresh_screen(map_=map_, seconds=2)
+				self.is_first_query = True
+
+		return path
\ No newline at end of file
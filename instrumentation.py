@@ -0,0 +1,85 @@
+import collections
+import contextlib
+import time
+
+class Timer():
+	"""Context manager adding the time spent within it to a phase."""
+	__slots__ = ('metrics', 'name', 'start')
+
+	def __init__(self, metrics, name):
+		self.metrics = metrics
+		self.name = name
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+
+	def __exit__(self, *exception):
+		self.metrics.timers[self.name] += time.perf_counter() - self.start
+		self.metrics.calls[self.name] += 1
+
+class Metrics():
+	"""
+	Counters of the hot paths and timers of each phase of a run.
+
+	Disabled by default, in which case the hot paths only check the
+	enabled flag and timers are a shared no-op context manager. Gauges,
+	e.g. the coverage estimate, are set once per run and always kept.
+
+	Attributes
+	----------
+	enabled : bool
+		Whether counters and timers are recorded.
+	"""
+
+	NO_TIMER = contextlib.nullcontext()
+
+	def __init__(self):
+		self.enabled = False
+		self.counters = collections.Counter()
+		self.timers = collections.defaultdict(float)
+		self.calls = collections.Counter()
+		self.gauges = {}
+
+	def count(self, name, n=1):
+		"""Adds n to the counter with the given name."""
+		if self.enabled:
+			self.counters[name] += n
+
+	def timer(self, name):
+		"""Context manager timing the phase with the given name."""
+		return Timer(self, name) if self.enabled else self.NO_TIMER
+
+	def gauge(self, name, value):
+		"""Sets the value of the gauge with the given name."""
+		self.gauges[name] = value
+
+	def reset(self):
+		"""Clears every counter, timer and gauge."""
+		self.counters.clear()
+		self.timers.clear()
+		self.calls.clear()
+		self.gauges.clear()
+
+	def as_dict(self):
+		"""Every recorded value, e.g. to write it as JSON."""
+		return {'counters': dict(self.counters), 'gauges': dict(self.gauges),
+			'timers': {name: {'seconds': seconds, 'calls': self.calls[name]}
+				for name, seconds in self.timers.items()}}
+
+	def summary(self):
+		"""Human readable report of the gauges, and of counters and timers if recorded."""
+		lines = [f'{name}: {value}' for name, value in self.gauges.items()]
+
+		if self.counters:
+			lines.append('Counters')
+			lines += [f'  {name}: {value}' for name, value in sorted(self.counters.items())]
+
+		if self.timers:
+			lines.append('Timers')
+			lines += [f'  {name}: {seconds:.4f} s in {self.calls[name]} calls'
+				for name, seconds in sorted(self.timers.items())]
+
+		return '\n'.join(lines)
+
+# Metrics of the current process
+metrics = Metrics()
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import numpy as np
+import pygame
+
+class GridMap():
+	"""
+	An occupancy map made of cells, one per pixel of the map.
+
+	Cells are only read a block of rows at a time, so a map memory-mapped
+	from its file is never loaded whole. Unknown cells are taken as
+	blocked, so the robot never enters them.
+
+	Attributes
+	----------
+	cells : numpy.ndarray
+		Raw values of the cells, shape (height, width), possibly a memory map.
+	blocked : callable
+		Function telling from a block of raw values which cells are blocked.
+	path : str
+		File the map was loaded from.
+	"""
+
+	def __init__(self, cells, blocked, path=None):
+		self.cells = cells
+		self.blocked = blocked
+		self.path = path
+		self.HEIGHT, self.WIDTH = cells.shape[:2]
+
+	def rows(self, top, bottom):
+		"""Boolean mask of the blocked cells of the given rows."""
+		return self.blocked(np.asarray(self.cells[top:bottom]))
+
+	def __reduce__(self):
+		"""Pickled as its file, e.g. for worker processes, which map it again."""
+		return load, (self.path,)
+
+	def fingerprint(self):
+		"""Hash identifying the content of the map."""
+		digest = hashlib.sha256(repr(self.cells.shape).encode())
+
+		for top in range(0, self.HEIGHT, 1024):
+			digest.update(self.rows(top, top + 1024).tobytes())
+
+		return digest.hexdigest()
+
+def read_pgm(path):
+	"""Memory map of the pixels of a binary PGM image, without loading it."""
+	with open(path, 'rb') as file:
+		header = []
+
+		# Magic number, width, height and maximum value, comments aside
+		while len(header) < 4:
+			line = file.readline()
+			header += line.split(b'#')[0].split()
+
+		offset = file.tell()
+
+	if header[0] != b'P5':
+		raise ValueError(f'{path} is not a binary PGM image')
+
+	width, height, maximum = map(int, header[1:])
+	dtype = np.uint8 if maximum < 256 else np.dtype('>u2')
+
+	return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(height, width))
+
+def read_image(path):
+	"""Gray levels of an image, memory-mapped if it is a binary PGM."""
+	if path.lower().endswith('.pgm'):
+		return read_pgm(path)
+
+	# Copied rather than referenced, so grayscale and palettized images load too
+	pixels = pygame.surfarray.array3d(pygame.image.load(path)).swapaxes(0, 1)
+
+	return pixels.mean(axis=2).astype(np.uint8)
+
+def read_yaml(path):
+	"""Keys of a ROS map description, which holds one key: value pair per line."""
+	description = {}
+
+	with open(path) as file:
+		for line in file:
+			key, _, value = line.split('#')[0].partition(':')
+			if value.strip():
+				description[key.strip()] = value.strip().strip('\'"')
+
+	return description
+
+def load(path):
+	"""Occupancy map of a file.
+
+	Boolean .npy grids are True where blocked, and any other .npy grid,
+	e.g. a ROS occupancy grid, is blocked where nonzero, so its unknown
+	cells are too. They are memory-mapped, as are binary PGM images.
+	Images are blocked where darker than the free threshold of ROS, and
+	a ROS map description gives the image along with its thresholds.
+
+	Parameters
+	----------
+	path : str
+		File of the map, either .npy, .pgm, .png or a ROS .yaml.
+
+	Returns
+	-------
+	GridMap
+	"""
+	extension = os.path.splitext(path)[1].lower()
+
+	if extension == '.npy':
+		cells = np.load(path, mmap_mode='r')
+		blocked = (lambda block: block) if cells.dtype == bool else (lambda block: block != 0)
+
+		return GridMap(cells=cells, blocked=blocked, path=path)
+
+	if extension in ('.yaml', '.yml'):
+		description = read_yaml(path)
+		image = os.path.join(os.path.dirname(path), description['image'])
+		negate = description.get('negate', '0') not in ('0', 'false', 'False')
+		free_threshold = float(description.get('free_thresh', 0.196))
+	else:
+		image, negate, free_threshold = path, False, 0.196
+
+	# Occupancy of a gray level is (255 - level) / 255, or level / 255 if negated
+	cells = read_image(image)
+	maximum = 255 if cells.dtype == np.uint8 else 65535
+	threshold = free_threshold * maximum
+
+	if negate:
+		blocked = lambda block: block > threshold
+	else:
+		blocked = lambda block: maximum - block.astype(np.int32) > threshold
+
+	return GridMap(cells=cells, blocked=blocked, path=path)
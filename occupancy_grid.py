@@ -0,0 +1,203 @@
+import tempfile
+import numpy as np
+import pygame
+import collision
+import instrumentation
+
+class OccupancyGrid():
+	"""
+	A raster of the configuration space at map resolution.
+
+	Each cell tells whether the robot centered at that pixel collides with
+	an obstacle, so the obstacles are inflated by the robot radius only once
+	and point queries become an array lookup regardless of the number of
+	obstacles. Segments are checked by gathering the cells along them, which
+	is accurate up to one pixel.
+
+	The blocked cells of an occupancy map are inflated the same way, and
+	grids too large for memory are kept in a temporary file mapped in
+	memory, so only the pages being checked are loaded.
+
+	Attributes
+	----------
+	obstacles : list
+		Obstacles as pygame.Rect, Polygon or Circle.
+	radius : int
+		Robot radius.
+	map_dimensions : tuple
+		Map width and height in pixels.
+	grid_map : GridMap
+		Occupancy map blocking the robot as well, None for none.
+	max_cells : int
+		Number of cells above which the grid is kept in a file.
+	"""
+
+	def __init__(self, obstacles, radius, map_dimensions, grid_map=None, max_cells=2**26):
+		self.radius = radius
+		self.WIDTH, self.HEIGHT = map_dimensions
+
+		# Rows are Y coordinates, columns are X coordinates
+		shape = (self.HEIGHT + 1, self.WIDTH + 1)
+
+		if shape[0] * shape[1] > max_cells:
+			self.grid = np.memmap(tempfile.TemporaryFile(), dtype=bool, mode='w+', shape=shape)
+		else:
+			self.grid = np.zeros(shape, dtype=bool)
+
+		if grid_map is not None:
+			self.inflate(grid_map=grid_map)
+
+		for obstacle in obstacles:
+			if not isinstance(obstacle, pygame.Rect):
+				continue
+
+			# Pixels strictly inside the inflated obstacle collide
+			left = max(obstacle.left - radius + 1, 0)
+			top = max(obstacle.top - radius + 1, 0)
+			right = max(obstacle.right + radius, 0)
+			bottom = max(obstacle.bottom + radius, 0)
+			self.grid[top:bottom, left:right] = True
+
+		# Any other shape is rasterized with the exact checker, a block of rows at a time
+		shapes = [obstacle for obstacle in obstacles if not isinstance(obstacle, pygame.Rect)]
+
+		if shapes:
+			collider = collision.ShapeCollider(obstacles=shapes, radius=radius)
+
+			for top in range(0, self.HEIGHT + 1, 64):
+				ys, xs = np.mgrid[top:min(top + 64, self.HEIGHT + 1), 0:self.WIDTH + 1]
+				free = collider.are_free(points=np.column_stack((xs.ravel(), ys.ravel())))
+				self.grid[ys, xs] |= ~free.reshape(xs.shape)
+
+	def inflate(self, grid_map, block_cells=2**22):
+		"""Marks the pixels where the robot overlaps a blocked cell of the map.
+
+		As for a rectangle of one cell, the robot at a pixel overlaps the
+		cells from radius before to radius - 1 after it along each axis.
+		The blocked cells within such window are counted with cumulative
+		sums, along the columns and then along the rows, for a block of
+		rows at a time so the map is never loaded whole.
+
+		Parameters
+		----------
+		grid_map : GridMap
+			Occupancy map blocking the robot.
+		block_cells : int
+			Approximate number of cells of the map read at once.
+		"""
+		before, after = self.radius, max(self.radius - 1, 0)
+		height, width = grid_map.HEIGHT, grid_map.WIDTH
+		block = max(block_cells // max(width, 1), 1)
+
+		xs = np.arange(self.WIDTH + 1)
+		x_first, x_last = np.clip(xs - before, 0, width), np.clip(xs + after + 1, 0, width)
+
+		for top in range(0, self.HEIGHT + 1, block):
+			bottom = min(top + block, self.HEIGHT + 1)
+			first, last = max(top - before, 0), min(bottom + after, height)
+
+			if first >= last:
+				continue
+
+			counts = np.zeros((last - first + 1, width), dtype=np.int32)
+			np.cumsum(grid_map.rows(first, last), axis=0, out=counts[1:])
+			ys = np.arange(top, bottom)
+			columns = counts[np.clip(ys + after + 1, first, last) - first] > \
+				counts[np.clip(ys - before, first, last) - first]
+
+			counts = np.zeros((bottom - top, width + 1), dtype=np.int32)
+			np.cumsum(columns, axis=1, out=counts[:, 1:])
+			self.grid[top:bottom] |= counts[:, x_last] > counts[:, x_first]
+
+	def is_free(self, point):
+		"""Checks if the robot centered at the given point is collision free.
+
+		Parameters
+		----------
+		point : tuple
+			Center of the robot.
+
+		Returns
+		-------
+		bool
+		"""
+		if instrumentation.metrics.enabled:
+			instrumentation.metrics.count('is_free')
+
+		x, y = int(point[0]), int(point[1])
+
+		if not (0 <= x <= self.WIDTH and 0 <= y <= self.HEIGHT):
+			return True
+
+		return not self.grid[y, x]
+
+	def are_free(self, points):
+		"""Checks a batch of robot centers with a single lookup.
+
+		Parameters
+		----------
+		points : array_like
+			Centers of the robot, shape (n, 2).
+
+		Returns
+		-------
+		numpy.ndarray
+			Boolean mask, True where the robot is collision free.
+		"""
+		points = np.asarray(points).reshape(-1, 2).astype(int)
+		instrumentation.metrics.count('is_free', len(points))
+		xs, ys = points[:, 0], points[:, 1]
+		inside = (xs >= 0) & (xs <= self.WIDTH) & (ys >= 0) & (ys <= self.HEIGHT)
+
+		return ~(self.grid[ys.clip(0, self.HEIGHT), xs.clip(0, self.WIDTH)] & inside)
+
+	def cross_obstacle(self, p1, p2):
+		"""Checks if the robot moving from p1 to p2 crosses an obstacle.
+
+		Parameters
+		----------
+		p1 : tuple
+			Initial center of the robot.
+		p2 : tuple
+			End center of the robot.
+
+		Returns
+		-------
+		bool
+		"""
+		return bool(self.cross_obstacles(starts=p1, ends=[p2])[0])
+
+	def cross_obstacles(self, starts, ends):
+		"""Checks a batch of segments by gathering the cells along them.
+
+		Parameters
+		----------
+		starts : array_like
+			Initial centers of the robot, shape (n, 2) or (2,) to share it.
+		ends : array_like
+			End centers of the robot, shape (n, 2).
+
+		Returns
+		-------
+		numpy.ndarray
+			Boolean mask, True where the segment crosses an obstacle.
+		"""
+		starts = np.asarray(starts, dtype=float).reshape(-1, 1, 2)
+		ends = np.asarray(ends, dtype=float).reshape(-1, 1, 2)
+		n = np.broadcast_shapes(starts.shape, ends.shape)[0]
+		instrumentation.metrics.count('cross_obstacle', n)
+
+		if n == 0:
+			return np.zeros(0, dtype=bool)
+
+		# One step per pixel along each segment, the shorter ones repeat their end
+		direction = ends - starts
+		steps = np.abs(direction).max(axis=2, keepdims=True).astype(int) + 1
+		t = np.minimum(np.arange(steps.max() + 1).reshape(1, -1, 1), steps) / steps
+		points = np.rint(starts + t * direction).astype(int)
+
+		xs, ys = points[..., 0], points[..., 1]
+		inside = (xs >= 0) & (xs <= self.WIDTH) & (ys >= 0) & (ys <= self.HEIGHT)
+		hits = self.grid[ys.clip(0, self.HEIGHT), xs.clip(0, self.WIDTH)] & inside
+
+		return hits.any(axis=1)
@@ -0,0 +1,136 @@
+import itertools
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import instrumentation
+
+# Collision checker and shared guard snapshot of each worker process
+_collider = None
+_snapshot = None
+
+def initialize(collider):
+	"""Keeps the collision checker of the planner within the worker process."""
+	global _collider
+	_collider = collider
+
+def attach(name):
+	"""Shared memory block with the given name, attached once per worker."""
+	global _snapshot
+
+	if _snapshot is None or _snapshot.name != name:
+		if _snapshot is not None:
+			_snapshot.close()
+		_snapshot = shared_memory.SharedMemory(name=name)
+
+	return _snapshot
+
+def evaluate(name, n_guards, samples):
+	"""Checks a chunk of free samples against the guards of the snapshot.
+
+	Parameters
+	----------
+	name : str
+		Shared memory block holding the positions of the guards.
+	n_guards : int
+		Number of guards in the snapshot.
+	samples : numpy.ndarray
+		Positions of the samples, shape (n, 2).
+
+	Returns
+	-------
+	numpy.ndarray
+		Boolean mask of shape (n, n_guards), True where the guard is seen
+		from the sample.
+	"""
+	guards = np.ndarray((n_guards, 2), dtype=np.int32, buffer=attach(name).buf)
+	visible = np.zeros((len(samples), n_guards), dtype=bool)
+
+	for i, sample in enumerate(samples):
+		visible[i] = ~_collider.cross_obstacles(starts=sample, ends=guards)
+
+	return visible
+
+def commit(planner, samples, visible, n_snapshot):
+	"""Applies the visibility rule to the samples in the order they were drawn.
+
+	Guards inserted after the snapshot are checked here, so every sample
+	sees exactly the guards it would have seen in a serial construction.
+
+	Parameters
+	----------
+	planner : VisibilityPRM
+		Planner whose roadmap is built.
+	samples : numpy.ndarray
+		Positions of the free samples, shape (n, 2).
+	visible : numpy.ndarray
+		Guards of the snapshot seen from each sample, shape (n, n_snapshot).
+	n_snapshot : int
+		Number of guards in the snapshot.
+	"""
+	for sample, seen in zip(samples, visible):
+		if planner.termination.done(planner):
+			break
+
+		position = tuple(sample.tolist())
+		seen = seen.nonzero()[0]
+		new = planner.guards[n_snapshot:]
+
+		# Read again every time, as the roadmap reallocates its arrays when growing
+		if new:
+			blocked = planner.graph.collider.cross_obstacles(starts=position,
+				ends=planner.graph.roadmap.points[new])
+			seen = np.concatenate((seen, np.flatnonzero(~blocked) + n_snapshot))
+
+		planner.termination.update(planner, planner.apply(position, seen))
+
+def build(planner, workers, chunk_size=256):
+	"""Builds the roadmap checking the samples in a pool of processes.
+
+	Free samples are taken in batches by this process, so they follow the
+	same random sequence as the serial construction. Each worker checks a chunk
+	of them against a snapshot of the guards in shared memory, and the
+	batch is then committed serially.
+
+	Parameters
+	----------
+	planner : VisibilityPRM
+		Planner whose roadmap is built.
+	workers : int
+		Number of worker processes.
+	chunk_size : int
+		Number of samples checked by each worker per batch.
+	"""
+	# Created before the pool, so the workers share the resource tracker of this process
+	snapshot = shared_memory.SharedMemory(create=True, size=4096)
+	pool = multiprocessing.Pool(processes=workers, initializer=initialize,
+		initargs=(planner.graph.collider,))
+
+	try:
+		while not planner.termination.done(planner):
+			guards = planner.graph.roadmap.points[planner.guards]
+
+			if snapshot.size < guards.nbytes:
+				snapshot.close()
+				snapshot.unlink()
+				snapshot = shared_memory.SharedMemory(create=True, size=max(2*guards.nbytes, 4096))
+
+			np.ndarray(guards.shape, dtype=np.int32, buffer=snapshot.buf)[:] = guards
+
+			with instrumentation.metrics.timer('sampling'):
+				samples = np.array(list(itertools.islice(planner.samples, workers*chunk_size)),
+					dtype=np.int32)
+
+			# Collision checks of the workers are not counted in this process
+			with instrumentation.metrics.timer('visibility'):
+				chunks = np.array_split(samples, workers)
+				visible = np.concatenate(pool.starmap(evaluate, [(snapshot.name, len(guards),
+					chunk) for chunk in chunks]))
+
+			commit(planner=planner, samples=samples, visible=visible, n_snapshot=len(guards))
+	finally:
+		pool.close()
+		pool.join()
+		snapshot.close()
+		snapshot.unlink()
+
+	return planner
@@ -0,0 +1,551 @@
+import hashlib
+import math
+import json
+import os
+import numpy as np
+import pygame
+import graph
+import instrumentation
+import parallel
+import roadmap
+import sampling
+import termination
+import spatial_index
+
+def fingerprint(obstacles):
+	"""Hash identifying a set of obstacles regardless of their order."""
+	rectangles = sorted((obstacle.left, obstacle.top, obstacle.width, obstacle.height)
+		for obstacle in obstacles if isinstance(obstacle, pygame.Rect))
+	shapes = sorted(repr(obstacle) for obstacle in obstacles
+		if not isinstance(obstacle, pygame.Rect))
+
+	return hashlib.sha256(repr(rectangles + shapes).encode()).hexdigest()
+
+
+class VisibilityPRM():
+	"""
+	The Visibility PRM algorithm, free of any display.
+
+	It builds the roadmap and answers queries on its own so it can run in
+	batch. Anything following the construction, e.g. the renderer, subscribes
+	as an observer and is notified of every free sample.
+
+	Attributes
+	----------
+	map_dimensions : tuple
+		Map width and height in pixels.
+	radius : int
+		Robot radius.
+	obstacles : list
+		Obstacles as pygame.Rect, Polygon or Circle.
+	M : int
+		Maximum number of failures before inserting a new guard node.
+	occupancy_grid : bool
+		Check collisions in a precomputed raster.
+	seed : int
+		Seed of every random draw of the planner, None for a fresh one.
+		The same seed, map and parameters give the same roadmap, serially
+		or in parallel.
+	sampler : str
+		Sampling strategy, one of sampling.SAMPLERS.
+	grid_map : GridMap
+		Occupancy map blocking the robot along with the obstacles, None
+		for none.
+	"""
+
+	def __init__(self, map_dimensions, radius, obstacles, M=10, occupancy_grid=False, seed=None,
+		sampler='uniform', grid_map=None):
+		self.M = M
+		self.map_dimensions = tuple(map_dimensions)
+		self.radius = radius
+
+		# A fresh seed is kept as well, so any run can be reproduced
+		self.seed = np.random.SeedSequence().entropy if seed is None else seed
+		self.rng = np.random.default_rng(self.seed)
+
+		self.graph = graph.Graph(start=None, goal=None, map_dimensions=map_dimensions,
+			radius=radius, occupancy_grid=occupancy_grid, grid_map=grid_map)
+		self.graph.obstacles = obstacles
+
+		# Free samples, drawn and filtered in blocks but consumed one at a time
+		self.sampler = sampling.SAMPLERS[sampler](map_dimensions=map_dimensions,
+			collider=self.graph.collider, rng=self.rng)
+		self.samples = iter(self.sampler)
+
+		self.guards = []
+		self.connections = []
+		self.components = roadmap.DisjointSet()
+		self.graph.components = self.components
+		self.observers = []
+		self.termination = None
+
+		# Number of failures since the insertion of the last guard node
+		self.ntry = 0
+
+	def notify(self, event, position, *guards):
+		"""Sends an event of the construction to every observer.
+
+		Parameters
+		----------
+		event : str
+			Either 'guard', 'connection' or 'rejected'.
+		position : tuple
+			Position of the sampled configuration.
+		guards : tuple
+			Positions of the guards linked by a connection node.
+		"""
+		for observer in self.observers:
+			observer(event, position, *guards)
+
+	def add_guard(self, position):
+		"""Inserts a guard node into the roadmap."""
+		id_ = self.graph.add_node(center=position, node_type=roadmap.NodeType.GUARD)
+		self.guards.append(id_)
+		self.components.add(id_)
+		self.notify('guard', position)
+
+		return id_
+
+	def add_connection(self, position, guards):
+		"""Inserts a connection node linking guards of distinct components."""
+		id_ = self.graph.add_node(center=position, node_type=roadmap.NodeType.CONNECTION)
+		self.connections.append(id_)
+		self.components.add(id_)
+
+		# The connection node and the guards are neighbors of each other, and see each other
+		for guard in guards:
+			self.graph.add_edge(node1=id_, node2=guard, valid=True)
+			self.components.union(id_, guard)
+
+		self.notify('connection', position, *[self.graph.roadmap.center(guard)
+			for guard in guards])
+
+		return id_
+
+	def step(self, position=None):
+		"""Takes the next free sample and applies the visibility rule to it.
+
+		Parameters
+		----------
+		position : tuple
+			Free configuration to use instead of the next sample.
+
+		Returns
+		-------
+		str
+			Either 'guard', 'connection' or 'rejected'.
+		"""
+		if position is None:
+			with instrumentation.metrics.timer('sampling'):
+				position = next(self.samples)
+
+		# Guards seen from the sample, computed in a single batch
+		with instrumentation.metrics.timer('visibility'):
+			guards = self.graph.roadmap.points[self.guards]
+			blocked = self.graph.collider.cross_obstacles(starts=position, ends=guards)
+			visible = np.flatnonzero(~blocked)
+
+		return self.apply(position, visible)
+
+	def apply(self, position, visible):
+		"""Applies the visibility rule to a free configuration.
+
+		Parameters
+		----------
+		position : tuple
+			Position of the configuration in X and Y respectively.
+		visible : numpy.ndarray
+			Indices in guards of the guards seen from the configuration,
+			in increasing order.
+
+		Returns
+		-------
+		str
+			Either 'guard', 'connection' or 'rejected'.
+		"""
+		if len(visible) == 0:
+			# No guard sees the node, therefore it is a new guard node
+			self.ntry = 0
+			self.add_guard(position)
+			instrumentation.metrics.count('guards')
+			return 'guard'
+
+		self.ntry += 1
+
+		# First visible guard of every distinct component
+		components = {}
+		for i in visible.tolist():
+			guard = self.guards[i]
+			components.setdefault(self.components.find(guard), guard)
+
+		if len(components) > 1:
+			self.add_connection(position, list(components.values()))
+			instrumentation.metrics.count('connections')
+			return 'connection'
+
+		self.notify('rejected', position)
+		instrumentation.metrics.count('rejected')
+
+		return 'rejected'
+
+	def build(self, workers=1, termination_=None):
+		"""Samples until the termination criteria are met.
+
+		Parameters
+		----------
+		workers : int
+			Number of processes checking the samples. The roadmap is the
+			same as the one built serially from the same random state.
+		termination_ : termination.Termination
+			When to stop, by default after M consecutive failures to
+			insert a guard node. Kept as the termination attribute.
+		"""
+		self.termination = termination.Termination(M=self.M) if termination_ is None \
+			else termination_
+		self.termination.reset(self)
+
+		if workers > 1:
+			parallel.build(planner=self, workers=workers)
+			return self
+
+		while not self.termination.done(self):
+			self.termination.update(self, self.step())
+
+		return self
+
+	def anytime(self, start, goal, termination_=None):
+		"""Yields paths between two positions while the roadmap is built.
+
+		Start and goal are attached to the roadmap from the beginning, so the
+		first path is yielded as soon as they are connected. Construction
+		then goes on, yielding every shorter path found, until the
+		termination criteria are met or the caller stops iterating.
+
+		Parameters
+		----------
+		start : tuple
+			Initial position in X and Y respectively.
+		goal : tuple
+			End position in X and Y respectively.
+		termination_ : termination.Termination
+			When to stop refining, by default after M consecutive failures
+			to insert a guard node.
+
+		Yields
+		------
+		list
+			Positions from the start to the goal, each path shorter than the
+			previous one.
+		"""
+		self.termination = termination.Termination(M=self.M) if termination_ is None \
+			else termination_
+		self.termination.reset(self)
+		anchors = roadmap.Anchors(roadmap=self.graph.roadmap, components=self.components,
+			collider=self.graph.collider, start=start, goal=goal)
+		best, result = math.inf, None
+
+		while True:
+			# Paths only change when a node is inserted
+			if result != 'rejected' and anchors.joined():
+				with instrumentation.metrics.timer('query'):
+					path = anchors.path(graph=self.graph)
+
+				length = math.inf if path is None else sum(map(math.dist, path[:-1], path[1:]))
+
+				if length < best:
+					best = length
+					yield path
+
+			if self.termination.done(self):
+				return
+
+			result = self.step()
+			self.termination.update(self, result)
+
+	def save(self, directory):
+		"""Writes the roadmap in the directory, along with what it was built for.
+
+		Parameters
+		----------
+		directory : str
+			Directory holding one .npy file per array and a header.json.
+		"""
+		self.graph.roadmap.save(directory)
+
+		components = [self.components.find(id_) for id_ in range(len(self.components.parent))]
+
+		for name, array in (('guards', self.guards), ('connections', self.connections),
+			('components', components)):
+			np.save(os.path.join(directory, f'{name}.npy'), np.asarray(array, dtype=np.int32))
+
+		header = {'obstacles': fingerprint(self.graph.obstacles), 'radius': self.radius,
+			'map_dimensions': self.map_dimensions, 'M': self.M, 'ntry': self.ntry, 'seed': self.seed}
+
+		if self.graph.grid_map is not None:
+			header['grid_map'] = self.graph.grid_map.fingerprint()
+
+		with open(os.path.join(directory, 'header.json'), 'w') as file:
+			json.dump(header, file)
+
+	def load(self, directory):
+		"""Replaces the roadmap by the one saved in the directory.
+
+		Parameters
+		----------
+		directory : str
+			Directory written by save.
+
+		Raises
+		------
+		ValueError
+			If the roadmap was built for other obstacles, occupancy map,
+			robot radius or map dimensions.
+		"""
+		with open(os.path.join(directory, 'header.json')) as file:
+			header = json.load(file)
+
+		expected = {'obstacles': fingerprint(self.graph.obstacles), 'radius': self.radius,
+			'map_dimensions': list(self.map_dimensions)}
+
+		if self.graph.grid_map is not None:
+			expected['grid_map'] = self.graph.grid_map.fingerprint()
+
+		for key, value in expected.items():
+			if header.get(key) != value:
+				raise ValueError(f"Stale roadmap in {directory}: '{key}' does not match")
+
+		def load_array(name):
+			return np.load(os.path.join(directory, f'{name}.npy')).tolist()
+
+		roadmap_ = self.graph.roadmap.load(directory)
+		self.graph.index = spatial_index.SpatialIndex(cell_size=self.graph.index.cell_size)
+		self.guards, self.connections = load_array('guards'), load_array('connections')
+		self.ntry = header['ntry']
+
+		# Every node points straight to the representative of its component
+		self.components.parent = load_array('components')
+		self.components.size = np.bincount(self.components.parent,
+			minlength=len(self.components.parent)).tolist()
+
+		self.graph.index.extend(points=roadmap_.points[:roadmap_.n_nodes],
+			items=range(roadmap_.n_nodes))
+
+		edges = roadmap_.edges[:roadmap_.n_edges]
+		self.graph.edge_index = spatial_index.EdgeIndex(cell_size=self.graph.edge_index.cell_size)
+		self.graph.edge_index.extend(starts=roadmap_.points[edges[:, 0]],
+			ends=roadmap_.points[edges[:, 1]], items=range(roadmap_.n_edges))
+
+		return self
+
+	def add_obstacle(self, obstacle, M=None):
+		"""Adds an obstacle and repairs the roadmap around it.
+
+		Parameters
+		----------
+		obstacle : pygame.Rect, Polygon or Circle
+			New obstacle.
+		M : int
+			Consecutive failures ending the local resampling, by default
+			the M of the planner.
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the edges whose validity changed.
+		"""
+		return self.update_obstacles(obstacles=self.graph.obstacles + [obstacle],
+			changed=[obstacle], M=M)
+
+	def remove_obstacle(self, obstacle, M=None):
+		"""Removes an obstacle and repairs the roadmap around it.
+
+		Parameters
+		----------
+		obstacle : pygame.Rect, Polygon or Circle
+			Obstacle to remove, equal to one of the obstacles.
+		M : int
+			Consecutive failures ending the local resampling, by default
+			the M of the planner.
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the edges whose validity changed.
+		"""
+		obstacles = list(self.graph.obstacles)
+		obstacles.remove(obstacle)
+
+		return self.update_obstacles(obstacles=obstacles, changed=[obstacle], M=M)
+
+	def move_obstacle(self, obstacle, moved, M=None):
+		"""Moves an obstacle and repairs the roadmap around both positions.
+
+		Parameters
+		----------
+		obstacle : pygame.Rect, Polygon or Circle
+			Obstacle to move, equal to one of the obstacles.
+		moved : pygame.Rect, Polygon or Circle
+			The obstacle at its new position.
+		M : int
+			Consecutive failures ending the local resampling, by default
+			the M of the planner.
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the edges whose validity changed.
+		"""
+		obstacles = [moved if other == obstacle else other for other in self.graph.obstacles]
+
+		return self.update_obstacles(obstacles=obstacles, changed=[obstacle, moved], M=M)
+
+	def update_obstacles(self, obstacles, changed, M=None):
+		"""Replaces the obstacles, repairing only the roadmap near the changes.
+
+		Only the edges found by the edge index crossing the changed
+		obstacles, inflated by the robot radius, are checked again, so an
+		edge blocked by a new obstacle becomes invalid and one freed by a
+		removed obstacle becomes valid again. The components are then
+		recomputed from the valid edges, and the coverage is restored by
+		sampling around the changes and around the edges they invalidated.
+
+		Parameters
+		----------
+		obstacles : list
+			Every obstacle after the change.
+		changed : list
+			Obstacles added, removed or moved, at any of their positions.
+		M : int
+			Consecutive failures ending the local resampling, by default
+			the M of the planner.
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the edges whose validity changed.
+		"""
+		self.graph.obstacles = obstacles
+		self.sampler.collider = self.graph.collider
+		roadmap_ = self.graph.roadmap
+		regions = [(rect.left - self.radius, rect.top - self.radius, rect.right + self.radius,
+			rect.bottom + self.radius) for rect in changed]
+
+		# Edges are indexed in the order they are inserted, so both identifiers match
+		ids = np.unique(np.concatenate([self.graph.edge_index.crossing(region)
+			for region in regions]))
+		edges = roadmap_.edges[ids]
+		valid = ~self.graph.collider.cross_obstacles(starts=roadmap_.points[edges[:, 0]],
+			ends=roadmap_.points[edges[:, 1]])
+		updated = ids[roadmap_.valid[ids] != valid]
+		roadmap_.valid[ids] = valid
+
+		self.relink()
+
+		# Nodes cut apart by an invalidated edge may be linked again around it
+		for node1, node2 in roadmap_.edges[updated[~roadmap_.valid[updated]]].tolist():
+			(x1, y1), (x2, y2) = roadmap_.center(node1), roadmap_.center(node2)
+			regions.append((min(x1, x2) - self.radius, min(y1, y2) - self.radius,
+				max(x1, x2) + self.radius, max(y1, y2) + self.radius))
+
+		for region in regions:
+			self.resample(region=region, M=self.M if M is None else M)
+
+		return updated
+
+	def relink(self):
+		"""Recomputes the components from the valid edges."""
+		roadmap_ = self.graph.roadmap
+		edges = roadmap_.edges[:roadmap_.n_edges][roadmap_.valid[:roadmap_.n_edges]]
+		self.components.clear()
+		self.components.add(roadmap_.n_nodes - 1)
+
+		for node1, node2 in edges.tolist():
+			self.components.union(node1, node2)
+
+	def resample(self, region, M):
+		"""Applies the visibility rule to samples drawn within a region.
+
+		Local samples say nothing about the coverage of the whole free
+		space, so ntry is left as it was before them.
+
+		Parameters
+		----------
+		region : tuple
+			Box to sample as (left, top, right, bottom).
+		M : int
+			Consecutive failures to insert a guard node ending the sampling.
+
+		Returns
+		-------
+		int
+			Number of free samples drawn.
+		"""
+		width, height = self.map_dimensions
+		left, top = max(int(region[0]), 0), max(int(region[1]), 0)
+		right, bottom = min(int(region[2]), width - 1), min(int(region[3]), height - 1)
+		failures, samples, ntry = 0, 0, self.ntry
+
+		if left > right or top > bottom:
+			return 0
+
+		try:
+			# A region without free space is given up after a few blocks
+			for _ in range(16):
+				candidates = self.rng.integers(low=(left, top), high=(right + 1, bottom + 1),
+					size=(64, 2))
+				free = candidates[self.graph.collider.are_free(points=candidates)]
+
+				for position in map(tuple, free.tolist()):
+					samples += 1
+					failures = 0 if self.step(position=position) == 'guard' else failures + 1
+
+					if failures >= M:
+						return samples
+
+			return samples
+		finally:
+			self.ntry = ntry
+
+	@property
+	def coverage(self):
+		"""Estimated fraction of the free space covered by the visibility domains."""
+		return 1 - 1/self.ntry if self.ntry > 0 else 0.0
+
+	def query(self, start, goal):
+		"""Finds a path between two configurations along the roadmap.
+
+		Parameters
+		----------
+		start : tuple
+			Initial position in X and Y respectively.
+		goal : tuple
+			End position in X and Y respectively.
+
+		Returns
+		-------
+		list
+			Positions from the start to the goal, None if there is no path.
+		"""
+		with instrumentation.metrics.timer('query'):
+			self.graph.x_init, self.graph.x_goal = start, goal
+
+			return self.graph.query(init=start, goal=goal)
+
+	def query_many(self, queries):
+		"""Finds the paths of many queries over the same roadmap.
+
+		The roadmap is never modified by a query, so the same one serves
+		every pair of configurations.
+
+		Parameters
+		----------
+		queries : iterable
+			Pairs of initial and end positions.
+
+		Returns
+		-------
+		list
+			Path of each query, None for the queries without a path.
+		"""
+		with instrumentation.metrics.timer('query'):
+			return [self.graph.find_path(init=start, goal=goal) for start, goal in queries]
@@ -0,0 +1,146 @@
+import pygame
+import instrumentation
+
+class Renderer():
+	"""
+	Draws the construction of the roadmap after the fact.
+
+	Subscribed as an observer of the planner, it only records the events
+	so the construction is not slowed down by the display, and draws all
+	of them at once when asked to.
+
+	The robot is animated over a static layer, an off-screen surface with
+	the obstacles, the roadmap and the query drawn once. Each frame only
+	restores the area the robot left and draws it at its new position,
+	updating just those areas of the display, and frames are paced by a
+	clock instead of blocking delays, so the window keeps handling events.
+
+	Attributes
+	----------
+	environment : Environment
+		Map where the roadmap is drawn.
+	graph : Graph
+		Graph of the planner, which knows how to draw each node.
+	show_random_nodes : bool
+		Draws every free sample.
+	show_rejected_nodes : bool
+		Draws the samples that were neither guards nor connections.
+	show_enumerated_nodes : bool
+		Draws the number of each sample next to it.
+	"""
+
+	def __init__(self, environment, graph, show_random_nodes=False, show_rejected_nodes=False,
+		show_enumerated_nodes=False):
+		self.environment = environment
+		self.graph = graph
+		self.show_random_nodes = show_random_nodes
+		self.show_rejected_nodes = show_rejected_nodes
+		self.show_enumerated_nodes = show_enumerated_nodes
+
+		self.events = []
+		self.layers = {}
+
+	def __call__(self, event, position, *guards):
+		"""Records an event of the construction."""
+		self.events.append((event, position, guards))
+
+	def draw(self, start=0, stop=None):
+		"""Draws the recorded events from start to stop on the map, in order."""
+		with instrumentation.metrics.timer('drawing'):
+			map_ = self.environment.map
+
+			for number, (event, position, guards) in enumerate(self.events[start:stop],
+				start=start+1):
+				if self.show_random_nodes:
+					self.graph.draw_random_node(map_=map_, position=position)
+
+				if event == 'guard':
+					self.graph.draw_guard_node(map_=map_, position=position)
+				elif event == 'connection':
+					self.graph.draw_connection_node(map_=map_, position=position)
+					for guard in guards:
+						self.graph.draw_local_planner(p1=position, p2=guard, map_=map_)
+				elif self.show_rejected_nodes:
+					self.graph.draw_rejected_node(map_=map_, position=position)
+
+				if self.show_enumerated_nodes and (event != 'rejected' or self.show_rejected_nodes):
+					self.environment.draw_node_number(number=number, point=position)
+
+	def layer(self, keep_roadmap):
+		"""Off-screen surface with everything that does not move during the animation."""
+		if keep_roadmap in self.layers:
+			return self.layers[keep_roadmap]
+
+		layer = self.layers[keep_roadmap] = pygame.Surface(self.environment.map.get_size())
+		layer.fill(self.graph.WHITE)
+		self.environment.draw_obstacles(map_=layer)
+
+		if keep_roadmap:
+			self.graph.draw_roadmap(map_=layer)
+		else:
+			self.graph.draw_initial_node(map_=layer)
+			self.graph.draw_goal_node(map_=layer)
+
+		return layer
+
+	def closed(self):
+		"""Handles the pending events, True if the window was closed."""
+		return any(event.type == pygame.QUIT for event in pygame.event.get())
+
+	def wait(self, seconds, fps=50):
+		"""Keeps the display responsive for the given seconds.
+
+		Returns
+		-------
+		bool
+			False if the window was closed meanwhile.
+		"""
+		clock = pygame.time.Clock()
+
+		for _ in range(round(seconds * fps)):
+			clock.tick(fps)
+			if self.closed():
+				return False
+
+		return True
+
+	def animate(self, keep_roadmap, fps=50):
+		"""Moves the robot along the path, then shows the path for a while.
+
+		Parameters
+		----------
+		keep_roadmap : bool
+			Draws the roadmap behind the robot.
+		fps : int
+			Frames per second of the animation.
+
+		Returns
+		-------
+		bool
+			False if the window was closed meanwhile.
+		"""
+		map_ = self.environment.map
+		layer = self.layer(keep_roadmap=keep_roadmap)
+		map_.blit(layer, (0, 0))
+		pygame.display.update()
+
+		clock = pygame.time.Clock()
+		previous = None
+
+		for position in self.graph.smooth:
+			clock.tick(fps)
+			if self.closed():
+				return False
+
+			with instrumentation.metrics.timer('drawing'):
+				# Only the area the robot left and the one it moves to are redrawn
+				dirty = [] if previous is None else [map_.blit(layer, previous, area=previous)]
+				previous = self.graph.move_robot(position=position, map_=map_)
+				pygame.display.update(dirty + [previous])
+
+		with instrumentation.metrics.timer('drawing'):
+			map_.blit(layer, (0, 0))
+			self.graph.draw_path_to_goal(map_=map_)
+			pygame.display.update()
+
+		return self.wait(seconds=3, fps=fps)
@@ -0,0 +1,364 @@
+import enum
+import os
+import numpy as np
+
+def grow(array, size):
+	"""Returns the array doubled in length as many times as needed to hold size rows."""
+	if size <= len(array):
+		return array
+
+	length = max(len(array), 1)
+	while length < size:
+		length *= 2
+
+	grown = np.zeros((length,) + array.shape[1:], dtype=array.dtype)
+	grown[:len(array)] = array
+
+	return grown
+
+class NodeType(enum.IntEnum):
+	"""Role of a node within the roadmap."""
+	GUARD = 0
+	CONNECTION = 1
+	QUERY = 2
+
+class Node():
+	"""
+	A light view of a node of the roadmap.
+
+	Attributes
+	----------
+	roadmap : Roadmap
+		Roadmap holding the node.
+	id : int
+		Identifier of the node.
+	"""
+	__slots__ = ('roadmap', 'id')
+
+	def __init__(self, roadmap, id_):
+		self.roadmap = roadmap
+		self.id = id_
+
+	def __eq__(self, other):
+		return isinstance(other, Node) and self.roadmap is other.roadmap and self.id == other.id
+
+	def __hash__(self):
+		return hash(self.id)
+
+	def __repr__(self):
+		return f'Node({self.id}, {self.type.name}, {self.center})'
+
+	@property
+	def center(self):
+		"""Position of the node in X and Y respectively."""
+		x, y = self.roadmap.points[self.id]
+		return int(x), int(y)
+
+	@property
+	def type(self):
+		"""Role of the node."""
+		return NodeType(self.roadmap.types[self.id])
+
+	@property
+	def neighbors(self):
+		"""Nodes linked to this one by an edge."""
+		return [Node(self.roadmap, id_) for id_ in self.roadmap.neighbors(self.id)]
+
+class Roadmap():
+	"""
+	Nodes and edges of the roadmap stored in contiguous arrays.
+
+	Nodes are identified by their position in the arrays, so reaching
+	a node from its identifier is O(1). Edges are undirected, validated
+	once when inserted, and their adjacency is compressed (CSR) the first
+	time it is needed after any insertion.
+	"""
+
+	def __init__(self):
+		self.points = np.zeros((64, 2), dtype=np.int32)
+		self.types = np.zeros(64, dtype=np.int8)
+		self.edges = np.zeros((64, 2), dtype=np.int32)
+		self.lengths = np.zeros(64)
+		self.valid = np.zeros(64, dtype=bool)
+		self.n_nodes = 0
+		self.n_edges = 0
+
+		# Compressed adjacency, rebuilt lazily
+		self.indptr = None
+		self.indices = None
+		self.edge_ids = None
+
+	def __len__(self):
+		return self.n_nodes
+
+	def add_node(self, point, node_type):
+		"""Adds a node to the roadmap.
+
+		Parameters
+		----------
+		point : tuple
+			Position of the node in X and Y respectively.
+		node_type : NodeType
+			Role of the node.
+
+		Returns
+		-------
+		int
+			Identifier of the node.
+		"""
+		id_ = self.n_nodes
+		self.points = grow(self.points, id_ + 1)
+		self.types = grow(self.types, id_ + 1)
+		self.points[id_] = point
+		self.types[id_] = node_type
+		self.n_nodes += 1
+		self.indptr = None
+
+		return id_
+
+	def add_edge(self, node1, node2, valid):
+		"""Links two nodes of the roadmap.
+
+		Parameters
+		----------
+		node1 : int
+			Identifier of the first node.
+		node2 : int
+			Identifier of the second node.
+		valid : bool
+			Whether the local path between both nodes is collision free.
+
+		Returns
+		-------
+		int
+			Identifier of the edge.
+		"""
+		id_ = self.n_edges
+		self.edges = grow(self.edges, id_ + 1)
+		self.lengths = grow(self.lengths, id_ + 1)
+		self.valid = grow(self.valid, id_ + 1)
+		self.edges[id_] = node1, node2
+		self.lengths[id_] = np.hypot(*(self.points[node1] - self.points[node2]))
+		self.valid[id_] = valid
+		self.n_edges += 1
+		self.indptr = None
+
+		return id_
+
+	def save(self, directory):
+		"""Writes the arrays of the roadmap as .npy files in the directory."""
+		os.makedirs(directory, exist_ok=True)
+
+		for name, array in (('points', self.points[:self.n_nodes]),
+			('types', self.types[:self.n_nodes]), ('edges', self.edges[:self.n_edges]),
+			('lengths', self.lengths[:self.n_edges]), ('valid', self.valid[:self.n_edges])):
+			np.save(os.path.join(directory, f'{name}.npy'), array)
+
+	def load(self, directory):
+		"""Replaces the roadmap by the one saved in the directory.
+
+		The arrays are memory-mapped copy-on-write, so loading does not
+		read them in full and later changes never reach the files.
+		"""
+		def load_array(name):
+			return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='c')
+
+		self.points, self.types = load_array('points'), load_array('types')
+		self.edges, self.lengths, self.valid = load_array('edges'), load_array('lengths'), \
+			load_array('valid')
+		self.n_nodes, self.n_edges = len(self.points), len(self.edges)
+		self.indptr = None
+
+		return self
+
+	def node(self, id_):
+		"""View of the node with the given identifier."""
+		return Node(self, id_)
+
+	def center(self, id_):
+		"""Position of the node with the given identifier."""
+		x, y = self.points[id_]
+		return int(x), int(y)
+
+	def of_type(self, node_type):
+		"""Identifiers of every node with the given role."""
+		return np.flatnonzero(self.types[:self.n_nodes] == node_type)
+
+	def find(self, point):
+		"""Identifier of the node at the given position, None if there is none."""
+		ids = np.flatnonzero((self.points[:self.n_nodes] == point).all(axis=1))
+		return int(ids[0]) if len(ids) > 0 else None
+
+	def adjacency(self):
+		"""Compressed adjacency of the roadmap.
+
+		Returns
+		-------
+		tuple
+			Arrays indptr, indices and edge_ids, such that the neighbors of
+			node i are indices[indptr[i]:indptr[i+1]], reached through the
+			edges edge_ids[indptr[i]:indptr[i+1]].
+		"""
+		if self.indptr is None:
+			edges = self.edges[:self.n_edges]
+			sources = np.concatenate((edges[:, 0], edges[:, 1]))
+			targets = np.concatenate((edges[:, 1], edges[:, 0]))
+			order = np.argsort(sources, kind='stable')
+
+			self.indptr = np.zeros(self.n_nodes + 1, dtype=np.int64)
+			np.cumsum(np.bincount(sources, minlength=self.n_nodes), out=self.indptr[1:])
+			self.indices = targets[order]
+			self.edge_ids = np.tile(np.arange(self.n_edges), 2)[order]
+
+		return self.indptr, self.indices, self.edge_ids
+
+	def neighbors(self, id_):
+		"""Identifiers of the nodes linked to the given one."""
+		indptr, indices, _ = self.adjacency()
+		return indices[indptr[id_]:indptr[id_+1]]
+
+class DisjointSet():
+	"""
+	Union-find of the connected components of the roadmap.
+
+	Components are identified by a representative node, found with path
+	halving and merged by size, so both operations are nearly O(1).
+	"""
+
+	def __init__(self):
+		self.parent = []
+		self.size = []
+
+	def add(self, id_):
+		"""Makes the node with the given identifier a component on its own."""
+		while len(self.parent) <= id_:
+			self.parent.append(len(self.parent))
+			self.size.append(1)
+
+	def clear(self):
+		"""Removes every node."""
+		self.parent.clear()
+		self.size.clear()
+
+	def find(self, id_):
+		"""Representative node of the component holding the given node."""
+		parent = self.parent
+
+		while parent[id_] != id_:
+			parent[id_] = parent[parent[id_]]
+			id_ = parent[id_]
+
+		return id_
+
+	def union(self, id1, id2):
+		"""Merges the components of two nodes.
+
+		Returns
+		-------
+		bool
+			True if the nodes were in different components.
+		"""
+		root1, root2 = self.find(id1), self.find(id2)
+
+		if root1 == root2:
+			return False
+
+		if self.size[root1] < self.size[root2]:
+			root1, root2 = root2, root1
+
+		self.parent[root2] = root1
+		self.size[root1] += self.size[root2]
+
+		return True
+
+	def connected(self, id1, id2):
+		"""Checks if two nodes are in the same component."""
+		return self.find(id1) == self.find(id2)
+
+class Anchors():
+	"""
+	Nodes of the roadmap seen from the start and the goal of a query.
+
+	Each node is checked against both positions only once, after its
+	insertion, and only the nearest seen node of each component is kept.
+	Start and goal are joined as soon as they see a common component, which
+	the union-find of the roadmap tells in nearly O(1).
+
+	Attributes
+	----------
+	roadmap : Roadmap
+		Roadmap being built.
+	components : DisjointSet
+		Connected components of the roadmap.
+	collider : RectangleCollider or OccupancyGrid
+		Collision checker of the robot.
+	start : tuple
+		Initial position of the query.
+	goal : tuple
+		End position of the query.
+	"""
+
+	def __init__(self, roadmap, components, collider, start, goal):
+		self.roadmap = roadmap
+		self.components = components
+		self.collider = collider
+		self.start, self.goal = tuple(start), tuple(goal)
+
+		# Nearest seen node of every component, from the start and from the goal
+		self.seen = {}, {}
+		self.checked = 0
+		self.direct = not collider.cross_obstacle(p1=self.start, p2=self.goal)
+
+	def update(self):
+		"""Checks the nodes inserted since the last update from both positions."""
+		ids = np.arange(self.checked, self.roadmap.n_nodes)
+		points = self.roadmap.points[ids]
+		self.checked = self.roadmap.n_nodes
+
+		for seen, position in zip(self.seen, (self.start, self.goal)):
+			visible = ids[~self.collider.cross_obstacles(starts=position, ends=points)]
+			nodes = list(seen.values()) + visible.tolist()
+			distances = np.hypot(*(self.roadmap.points[nodes] - position).T)
+
+			# Components may have merged since the last update
+			seen.clear()
+			for i in np.argsort(distances, kind='stable').tolist():
+				seen.setdefault(self.components.find(nodes[i]), nodes[i])
+
+	def joined(self):
+		"""Checks if the start and the goal are connected through the roadmap."""
+		self.update()
+
+		return self.direct or not self.seen[0].keys().isdisjoint(self.seen[1].keys())
+
+	def path(self, graph):
+		"""Shortest path through the nodes kept for each common component.
+
+		Parameters
+		----------
+		graph : Graph
+			Graph searching along the roadmap.
+
+		Returns
+		-------
+		list
+			Positions from the start to the goal, None if they are not joined.
+		"""
+		if self.direct:
+			return [self.start, self.goal]
+
+		best, best_length = None, np.inf
+
+		for root in self.seen[0].keys() & self.seen[1].keys():
+			ids = graph.shortest_path(start=self.seen[0][root], end=self.seen[1][root])
+
+			if ids is None:
+				continue
+
+			path = [self.start] + [self.roadmap.center(id_) for id_ in ids] + [self.goal]
+			length = np.hypot(*np.diff(path, axis=0).T).sum()
+
+			if length < best_length:
+				best, best_length = path, length
+
+		return best
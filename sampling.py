@@ -0,0 +1,161 @@
+import numpy as np
+
+class UniformSampler():
+	"""
+	Collision free configurations drawn uniformly over the map.
+
+	Candidates are drawn in blocks from a numpy random generator, and the
+	colliding ones are discarded in a single batch check, so the free
+	samples are produced lazily without any per-sample overhead. Other
+	strategies only change how the candidates are drawn or accepted.
+
+	Attributes
+	----------
+	map_dimensions : tuple
+		Map width and height in pixels.
+	collider : RectangleCollider or OccupancyGrid
+		Collision checker of the robot.
+	rng : numpy.random.Generator
+		Source of randomness of the sampler.
+	batch_size : int
+		Number of candidates drawn at once.
+	"""
+
+	def __init__(self, map_dimensions, collider, rng=None, batch_size=4096):
+		self.WIDTH, self.HEIGHT = map_dimensions
+		self.collider = collider
+		self.rng = np.random.default_rng() if rng is None else rng
+		self.batch_size = batch_size
+
+	def uniform(self, n):
+		"""Positions drawn uniformly over the map, shape (n, 2)."""
+		return self.rng.integers(low=0, high=(self.WIDTH, self.HEIGHT), size=(n, 2))
+
+	def clip(self, points):
+		"""Rounds the points to pixels and keeps them within the map."""
+		return np.rint(points).astype(int).clip(0, (self.WIDTH - 1, self.HEIGHT - 1))
+
+	def draw(self, n):
+		"""Candidates of the sampler, shape (n, 2)."""
+		return self.uniform(n)
+
+	def accept(self, candidates):
+		"""Samples kept from the candidates, shape (m, 2)."""
+		return candidates[self.collider.are_free(points=candidates)]
+
+	def __iter__(self):
+		"""Yields the collision free samples one at a time, as tuples."""
+		while True:
+			samples = self.accept(self.draw(self.batch_size))
+
+			yield from map(tuple, samples.tolist())
+
+class HaltonSampler(UniformSampler):
+	"""
+	Low-discrepancy samples from the Halton sequence in bases 2 and 3.
+
+	The sequence covers the map far more evenly than independent uniform
+	draws, so fewer samples are needed to see the whole free space. It is
+	shifted by a random offset (Cranley-Patterson rotation), so distinct
+	seeds give distinct sequences.
+	"""
+
+	BASES = (2, 3)
+
+	def __init__(self, map_dimensions, collider, rng=None, batch_size=4096):
+		super().__init__(map_dimensions, collider, rng, batch_size)
+		self.index = 1
+		self.shift = self.rng.random(2)
+
+	def draw(self, n):
+		indices = np.arange(self.index, self.index + n)
+		self.index += n
+		points = np.zeros((n, 2))
+
+		for axis, base in enumerate(self.BASES):
+			i, fraction = indices.copy(), 1.0
+
+			while i.any():
+				fraction /= base
+				points[:, axis] += fraction * (i % base)
+				i //= base
+
+		points = (points + self.shift) % 1
+
+		return (points * (self.WIDTH, self.HEIGHT)).astype(int)
+
+class GaussianSampler(UniformSampler):
+	"""
+	Samples concentrated along the boundary of the obstacles.
+
+	Each candidate is paired with a neighbor at a normally distributed
+	offset, and the free one is kept when exactly one of both collides.
+	A share of plain uniform samples keeps the open space covered.
+
+	Attributes
+	----------
+	sigma : float
+		Standard deviation of the offset in pixels.
+	uniform_ratio : float
+		Fraction of the candidates accepted as uniform samples.
+	"""
+
+	def __init__(self, map_dimensions, collider, rng=None, batch_size=4096, sigma=20,
+		uniform_ratio=0.2):
+		super().__init__(map_dimensions, collider, rng, batch_size)
+		self.sigma = sigma
+		self.uniform_ratio = uniform_ratio
+
+	def accept(self, candidates):
+		neighbors = self.clip(candidates + self.rng.normal(0, self.sigma, candidates.shape))
+		free1 = self.collider.are_free(points=candidates)
+		free2 = self.collider.are_free(points=neighbors)
+		uniform = self.rng.random(len(candidates)) < self.uniform_ratio
+
+		samples = np.where(free1[:, None], candidates, neighbors)
+		keep = np.where(uniform, free1, free1 != free2)
+
+		return samples[keep]
+
+class BridgeSampler(UniformSampler):
+	"""
+	Samples in narrow passages found with the bridge test.
+
+	Each candidate is paired with a neighbor at a normally distributed
+	offset, and their midpoint is kept when both ends collide but the
+	midpoint is free, i.e. it lies on a short bridge between obstacles.
+	A share of plain uniform samples keeps the open space covered.
+
+	Attributes
+	----------
+	sigma : float
+		Standard deviation of the length of the bridge in pixels.
+	uniform_ratio : float
+		Fraction of the candidates accepted as uniform samples.
+	"""
+
+	def __init__(self, map_dimensions, collider, rng=None, batch_size=4096, sigma=20,
+		uniform_ratio=0.2):
+		super().__init__(map_dimensions, collider, rng, batch_size)
+		self.sigma = sigma
+		self.uniform_ratio = uniform_ratio
+
+	def accept(self, candidates):
+		neighbors = self.clip(candidates + self.rng.normal(0, self.sigma, candidates.shape))
+		midpoints = (candidates + neighbors) // 2
+		free1 = self.collider.are_free(points=candidates)
+		free2 = self.collider.are_free(points=neighbors)
+		free_midpoints = self.collider.are_free(points=midpoints)
+		uniform = self.rng.random(len(candidates)) < self.uniform_ratio
+
+		samples = np.where(uniform[:, None], candidates, midpoints)
+		keep = np.where(uniform, free1, ~free1 & ~free2 & free_midpoints)
+
+		return samples[keep]
+
+SAMPLERS = {
+	'uniform': UniformSampler,
+	'halton': HaltonSampler,
+	'gaussian': GaussianSampler,
+	'bridge': BridgeSampler,
+}
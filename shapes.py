@@ -0,0 +1,175 @@
+import json
+import math
+import numpy as np
+import pygame
+
+def triangulate(points):
+	"""Splits a simple polygon, convex or concave, into triangles by ear clipping.
+
+	Parameters
+	----------
+	points : numpy.ndarray
+		Vertices of the polygon in order, shape (n, 2).
+
+	Returns
+	-------
+	numpy.ndarray
+		Vertices of the triangles, shape (m, 3, 2).
+	"""
+	x, y = points[:, 0], points[:, 1]
+	area = np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)
+	indices = list(range(len(points)) if area > 0 else range(len(points) - 1, -1, -1))
+	triangles = []
+
+	def cross(o, a, b):
+		return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+	while len(indices) > 3:
+		n = len(indices)
+
+		for k in range(n):
+			a, b, c = points[indices[k-1]], points[indices[k]], points[indices[(k+1) % n]]
+
+			# Reflex or flat corners are not ears
+			if cross(a, b, c) <= 0:
+				continue
+
+			# Nor are corners with another vertex within them
+			others = points[[i for i in indices if i not in (indices[k-1], indices[k],
+				indices[(k+1) % n])]]
+			if len(others) and ((cross(a, b, others.T) >= 0) & (cross(b, c, others.T) >= 0) &
+				(cross(c, a, others.T) >= 0)).any():
+				continue
+
+			triangles.append((a, b, c))
+			del indices[k]
+			break
+		else:
+			# Only flat corners, or a self-intersecting polygon, are left
+			flat = [k for k in range(n) if cross(points[indices[k-1]], points[indices[k]],
+				points[indices[(k+1) % n]]) == 0]
+			if not flat:
+				break
+			del indices[flat[0]]
+
+	if len(indices) == 3:
+		triangles.append(tuple(points[indices]))
+
+	return np.array(triangles, dtype=float).reshape(-1, 3, 2)
+
+class Polygon():
+	"""
+	A polygon obstacle, convex or concave, without holes.
+
+	Attributes
+	----------
+	points : array_like
+		Vertices of the polygon in order, shape (n, 2).
+	"""
+
+	def __init__(self, points):
+		self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+
+		# Bounding box, as for pygame.Rect
+		self.left, self.top = self.points.min(axis=0).tolist()
+		self.right, self.bottom = self.points.max(axis=0).tolist()
+		self.width, self.height = self.right - self.left, self.bottom - self.top
+
+	def triangles(self):
+		"""Triangles covering the polygon, shape (m, 3, 2)."""
+		return triangulate(self.points)
+
+	def draw(self, map_, color):
+		"""Draws the polygon on the given surface."""
+		pygame.draw.polygon(surface=map_, color=color, points=self.points.tolist())
+
+	def __repr__(self):
+		return f'Polygon({[tuple(point) for point in self.points.tolist()]})'
+
+	def __eq__(self, other):
+		return repr(self) == repr(other)
+
+	def __hash__(self):
+		return hash(repr(self))
+
+class Circle():
+	"""
+	A circle obstacle.
+
+	For collisions it is replaced by the regular polygon circumscribed
+	about it, so no collision is missed.
+
+	Attributes
+	----------
+	center : tuple
+		Center of the circle in X and Y respectively.
+	radius : float
+		Radius of the circle.
+	sides : int
+		Number of sides of the circumscribed polygon.
+	"""
+
+	def __init__(self, center, radius, sides=32):
+		self.center = tuple(center)
+		self.radius = radius
+		self.sides = sides
+
+		# Bounding box of the circumscribed polygon, as for pygame.Rect
+		reach = radius / math.cos(math.pi / sides)
+		self.left, self.top = center[0] - reach, center[1] - reach
+		self.right, self.bottom = center[0] + reach, center[1] + reach
+		self.width = self.height = 2*reach
+
+	def triangles(self):
+		"""Fan of triangles covering the circumscribed polygon, shape (sides, 3, 2)."""
+		angles = np.linspace(0, 2*math.pi, self.sides + 1)
+		vertices = np.column_stack((np.cos(angles), np.sin(angles)))
+		vertices = self.center + vertices * self.radius / math.cos(math.pi / self.sides)
+		centers = np.broadcast_to(self.center, (self.sides, 2))
+
+		return np.stack((centers, vertices[:-1], vertices[1:]), axis=1)
+
+	def draw(self, map_, color):
+		"""Draws the circle on the given surface."""
+		pygame.draw.circle(surface=map_, color=color, center=self.center, radius=self.radius)
+
+	def __repr__(self):
+		return f'Circle({self.center}, {self.radius})'
+
+	def __eq__(self, other):
+		return repr(self) == repr(other)
+
+	def __hash__(self):
+		return hash(repr(self))
+
+def triangles(obstacle):
+	"""Triangles covering an obstacle, which may also be a pygame.Rect."""
+	if isinstance(obstacle, pygame.Rect):
+		obstacle = Polygon([obstacle.topleft, obstacle.topright, obstacle.bottomright,
+			obstacle.bottomleft])
+
+	return obstacle.triangles()
+
+def load(path):
+	"""Obstacles of a map description.
+
+	The description is a JSON object with any of the lists
+	"rectangles" of [left, top, width, height], "polygons" of lists of
+	[x, y] vertices, and "circles" of [x, y, radius].
+
+	Parameters
+	----------
+	path : str
+		JSON file of the map description.
+
+	Returns
+	-------
+	list
+		Obstacles as pygame.Rect, Polygon and Circle.
+	"""
+	with open(path) as file:
+		description = json.load(file)
+
+	return [pygame.Rect(*rectangle) for rectangle in description.get('rectangles', [])] + \
+		[Polygon(points) for points in description.get('polygons', [])] + \
+		[Circle(center=(x, y), radius=radius) for x, y, radius in description.get('circles', [])]
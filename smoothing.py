@@ -0,0 +1,190 @@
+import math
+import numpy as np
+
+def length(path):
+	"""Length of the path in pixels."""
+	return sum(math.dist(p1, p2) for p1, p2 in zip(path, path[1:]))
+
+def shortcut(path, collider):
+	"""Skips the waypoints of the path that can be seen past.
+
+	From each waypoint the path jumps straight to the farthest waypoint
+	in sight, checking the segments to all the remaining ones at once.
+
+	Parameters
+	----------
+	path : list
+		Positions from the initial to the goal configuration.
+	collider : RectangleCollider or OccupancyGrid
+		Collision checker of the robot.
+
+	Returns
+	-------
+	list
+		Waypoints kept, from the initial to the goal configuration.
+	"""
+	points = np.asarray(path, dtype=float)
+	kept = [0]
+
+	while kept[-1] < len(points) - 1:
+		i = kept[-1]
+		visible = np.flatnonzero(~collider.cross_obstacles(starts=points[i], ends=points[i+1:]))
+
+		# The next waypoint is always in sight along a valid path
+		kept.append(i + 1 + (visible[-1] if len(visible) else 0))
+
+	return [path[i] for i in kept]
+
+def random_shortcut(path, collider, rng, iterations=50, batch_size=64):
+	"""Shortcuts between random points anywhere along the path.
+
+	Each iteration draws a batch of pairs of points on distinct segments,
+	checks all of them at once, and keeps the collision free shortcut
+	that shortens the path the most. Points within a pixel of a waypoint
+	are moved onto it rather than added next to it, and no shortcut
+	leaves more waypoints than the path given. The waypoints left in
+	sight of each other are skipped last by shortcut.
+
+	Parameters
+	----------
+	path : list
+		Positions from the initial to the goal configuration.
+	collider : RectangleCollider or OccupancyGrid
+		Collision checker of the robot.
+	rng : numpy.random.Generator
+		Source of randomness of the shortcuts.
+	iterations : int
+		Number of batches drawn.
+	batch_size : int
+		Number of pairs of points drawn per batch.
+
+	Returns
+	-------
+	list
+		Positions from the initial to the goal configuration.
+	"""
+	path = list(path)
+	budget = len(path)
+
+	for _ in range(iterations):
+		if len(path) < 3:
+			break
+
+		points = np.asarray(path, dtype=float)
+		segments = points[1:] - points[:-1]
+		lengths = np.hypot(*segments.T)
+		arc = np.concatenate(([0], np.cumsum(lengths)))
+
+		a, b = np.sort(rng.integers(low=0, high=len(segments), size=(2, batch_size)), axis=0)
+		u, v = rng.random((2, batch_size))
+		distinct = a < b
+		a, b, u, v = a[distinct], b[distinct], u[distinct], v[distinct]
+
+		# Points within a pixel of either end of their segment are moved onto it
+		u = np.where(u*lengths[a] < 1, 0, np.where((1 - u)*lengths[a] < 1, 1, u))
+		v = np.where(v*lengths[b] < 1, 0, np.where((1 - v)*lengths[b] < 1, 1, v))
+
+		# Waypoints left by each shortcut, those ending on a waypoint adding none
+		inner_u, inner_v = (0 < u) & (u < 1), (0 < v) & (v < 1)
+		count = len(path) - (b - a) + (u == 1) + (v == 0) + inner_u + inner_v
+
+		# Pairs of points, and the length saved by joining them straight
+		p1 = points[a] + u[:, None] * segments[a]
+		p2 = points[b] + v[:, None] * segments[b]
+		saved = arc[b] + v*lengths[b] - arc[a] - u*lengths[a] - np.hypot(*(p2 - p1).T)
+
+		# The rest of both segments is checked too, as a raster may not agree with the whole
+		blocked = collider.cross_obstacles(starts=np.concatenate((points[a], p1, p2)),
+			ends=np.concatenate((p1, p2, points[b+1])))
+		saved[blocked.reshape(3, -1).any(axis=0) | (count > budget)] = 0
+
+		if len(saved) == 0 or saved.max() <= 1e-6:
+			continue
+
+		best = saved.argmax()
+		added = [tuple(point[best].tolist()) for point, inner in ((p1, inner_u), (p2, inner_v))
+			if inner[best]]
+		path = path[:a[best]+1+(u[best] == 1)] + added + path[b[best]+1-(v[best] == 0):]
+
+	return shortcut(path=path, collider=collider)
+
+def smooth(path, collider, distance=30, steps=8, tries=4):
+	"""Rounds the corners of the path with quadratic Bezier curves.
+
+	Each corner is cut between the points at the given distance along
+	both of its segments, up to half of each so that neighboring curves
+	do not overlap, using the corner as control point. The curves of
+	all the corners are checked at once, and the distance is halved for
+	the colliding ones, which are left sharp after the given tries.
+	Corners next to a colliding piece of the assembled path are left
+	sharp as well.
+
+	Parameters
+	----------
+	path : list
+		Positions from the initial to the goal configuration.
+	collider : RectangleCollider or OccupancyGrid
+		Collision checker of the robot.
+	distance : float
+		Distance in pixels from each corner where its curve starts.
+	steps : int
+		Number of segments approximating each curve.
+	tries : int
+		Number of times the distance is halved for the colliding curves.
+
+	Returns
+	-------
+	list
+		Positions from the initial to the goal configuration.
+	"""
+	if len(path) < 3:
+		return list(path)
+
+	points = np.asarray(path, dtype=float)
+	before, corners, after = points[:-2], points[1:-1], points[2:]
+	length_in = np.maximum(np.hypot(*(corners - before).T), 1e-9)
+	length_out = np.maximum(np.hypot(*(after - corners).T), 1e-9)
+
+	t = np.linspace(0, 1, steps+1)[None, :, None]
+	curves = np.empty((len(corners), steps+1, 2))
+	sharp = np.ones(len(corners), dtype=bool)
+	distances = np.full(len(corners), float(distance))
+
+	for _ in range(tries):
+		ids = np.flatnonzero(sharp)
+		start = corners - (corners - before) * (np.minimum(distances, length_in/2) /
+			length_in)[:, None]
+		end = corners + (after - corners) * (np.minimum(distances, length_out/2) /
+			length_out)[:, None]
+		candidates = ((1 - t)**2 * start[:, None] + 2*(1 - t)*t * corners[:, None] +
+			t**2 * end[:, None])[ids]
+
+		blocked = collider.cross_obstacles(starts=candidates[:, :-1].reshape(-1, 2),
+			ends=candidates[:, 1:].reshape(-1, 2)).reshape(len(ids), steps).any(axis=1)
+		curves[ids[~blocked]] = candidates[~blocked]
+		sharp[ids[~blocked]] = False
+		distances /= 2
+
+		if not sharp.any():
+			break
+
+	# Pieces of the segments joining the curves are checked once the path is assembled
+	while True:
+		smoothed, owners = [path[0]], [()]
+
+		for i, corner in enumerate(path[1:-1]):
+			piece = [corner] if sharp[i] else list(map(tuple, curves[i].tolist()))
+			smoothed += piece
+			owners += [(i - 1, i)] + [(i,)] * (len(piece) - 1)
+
+		smoothed.append(path[-1])
+		owners.append((len(corners) - 1,))
+
+		points = np.asarray(smoothed, dtype=float)
+		blocked = np.flatnonzero(collider.cross_obstacles(starts=points[:-1], ends=points[1:]))
+		culprits = [i for j in blocked for i in owners[j+1] if i >= 0 and not sharp[i]]
+
+		if not culprits:
+			return smoothed
+
+		sharp[culprits] = True
@@ -0,0 +1,574 @@
+import numpy as np
+
+def k_smallest(points, point, k):
+	"""Indices of the k points closest to the given point.
+
+	Brute force, but vectorized, search used for small sets of points
+	and as a fallback of the spatial index.
+
+	Parameters
+	----------
+	points : numpy.ndarray
+		Coordinates of the points, shape (n, 2).
+	point : tuple
+		Point to search its neighbors.
+	k : int
+		Number of neighbors.
+
+	Returns
+	-------
+	numpy.ndarray
+		Indices of the k-nearest points sorted by distance.
+	"""
+	points = np.asarray(points, dtype=float).reshape(-1, 2)
+	k = min(k, len(points))
+
+	if k == 0:
+		return np.zeros(0, dtype=int)
+
+	distances = np.hypot(points[:, 0] - point[0], points[:, 1] - point[1])
+	nearest = np.argpartition(distances, k-1)[:k] if k < len(points) else np.arange(k)
+
+	return nearest[np.argsort(distances[nearest], kind='stable')]
+
+def segment_distances(segments, point):
+	"""Distances from a point to many segments.
+
+	Parameters
+	----------
+	segments : numpy.ndarray
+		Ends of the segments as (x1, y1, x2, y2), shape (n, 4).
+	point : tuple
+		Point to measure from.
+
+	Returns
+	-------
+	tuple
+		Arrays of the distances and of the closest points, shapes (n,)
+		and (n, 2).
+	"""
+	starts, ends = segments[:, :2], segments[:, 2:]
+	direction = ends - starts
+	squared = (direction**2).sum(axis=1)
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		t = ((np.asarray(point) - starts) * direction).sum(axis=1) / squared
+
+	t = np.where(squared > 0, t, 0).clip(0, 1)
+	closest = starts + t[:, None] * direction
+
+	return np.hypot(*(closest - point).T), closest
+
+def ring(center, distance, min_cell, max_cell):
+	"""Buckets at the given ring distance from the center, within the bounds."""
+	cx, cy = center
+	(x_min, y_min), (x_max, y_max) = min_cell, max_cell
+
+	if distance == 0:
+		return [center]
+
+	cells = [(x, y) for x in range(max(cx - distance, x_min), min(cx + distance, x_max) + 1)
+		for y in (cy - distance, cy + distance)]
+	cells += [(x, y) for y in range(max(cy - distance + 1, y_min), min(cy + distance - 1, y_max) + 1)
+		for x in (cx - distance, cx + distance)]
+
+	return cells
+
+class SpatialIndex():
+	"""
+	A uniform grid of buckets over the nodes of the roadmap.
+
+	Nodes are inserted incrementally, and nearest neighbor queries only
+	visit the buckets around the query point, ring by ring, until no
+	closer node can be found.
+
+	Attributes
+	----------
+	cell_size : int
+		Width and height of each bucket in pixels.
+	"""
+
+	# Below this number of nodes a brute force search is faster
+	BRUTE_FORCE = 256
+
+	def __init__(self, cell_size=40):
+		self.cell_size = cell_size
+		self.cells = {}
+		self.points = np.zeros((64, 2))
+		self.items = []
+
+		# Bounds of the non-empty buckets
+		self.min_cell = None
+		self.max_cell = None
+
+	def __len__(self):
+		return len(self.items)
+
+	def cell(self, point):
+		"""Bucket containing the given point."""
+		return int(point[0] // self.cell_size), int(point[1] // self.cell_size)
+
+	def insert(self, point, item=None):
+		"""Adds a point to the index.
+
+		Parameters
+		----------
+		point : tuple
+			Coordinates of the node.
+		item : object
+			Value returned for the node, e.g. its identifier in the roadmap.
+
+		Returns
+		-------
+		int
+			Identifier of the node within the index.
+		"""
+		id_ = len(self.items)
+
+		if id_ == len(self.points):
+			self.points = np.concatenate((self.points, np.zeros_like(self.points)))
+
+		self.points[id_] = point
+		self.items.append(item)
+
+		cell = self.cell(point)
+		self.cells.setdefault(cell, []).append(id_)
+
+		if self.min_cell is None:
+			self.min_cell, self.max_cell = cell, cell
+		else:
+			self.min_cell = min(self.min_cell[0], cell[0]), min(self.min_cell[1], cell[1])
+			self.max_cell = max(self.max_cell[0], cell[0]), max(self.max_cell[1], cell[1])
+
+		return id_
+
+	def extend(self, points, items):
+		"""Adds many points to the index at once.
+
+		Parameters
+		----------
+		points : numpy.ndarray
+			Coordinates of the nodes, shape (n, 2).
+		items : list
+			Value returned for each node.
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the nodes within the index.
+		"""
+		points = np.asarray(points, dtype=float).reshape(-1, 2)
+		first, last = len(self.items), len(self.items) + len(points)
+
+		if len(points) == 0:
+			return np.zeros(0, dtype=int)
+
+		if last > len(self.points):
+			grown = np.zeros((max(last, 2*len(self.points)), 2))
+			grown[:first] = self.points[:first]
+			self.points = grown
+
+		self.points[first:last] = points
+		self.items.extend(items)
+
+		# Group the new identifiers by bucket
+		ids = np.arange(first, last)
+		cells = (points // self.cell_size).astype(int)
+		order = np.lexsort((cells[:, 1], cells[:, 0]))
+		cells, ids = cells[order], ids[order]
+		starts = np.flatnonzero(np.any(np.diff(cells, axis=0) != 0, axis=1)) + 1
+
+		for cell, group in zip(cells[np.r_[0, starts]].tolist(), np.split(ids, starts)):
+			self.cells.setdefault(tuple(cell), []).extend(group.tolist())
+
+		low, high = tuple(cells.min(axis=0).tolist()), tuple(cells.max(axis=0).tolist())
+		if self.min_cell is None:
+			self.min_cell, self.max_cell = low, high
+		else:
+			self.min_cell = min(self.min_cell[0], low[0]), min(self.min_cell[1], low[1])
+			self.max_cell = max(self.max_cell[0], high[0]), max(self.max_cell[1], high[1])
+
+		return np.arange(first, last)
+
+	def ring(self, center, distance):
+		"""Identifiers of the nodes in the buckets at the given ring distance."""
+		ids = []
+
+		for cell in ring(center, distance, self.min_cell, self.max_cell):
+			ids.extend(self.cells.get(cell, []))
+
+		return ids
+
+	def nearest(self, point, k=1):
+		"""Given k, it returns the k-nearest nodes to the point.
+
+		Parameters
+		----------
+		point : tuple
+			Point to search its neighbors.
+		k : int
+			Number of neighbors.
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the k-nearest nodes sorted by distance.
+		"""
+		if len(self.items) <= self.BRUTE_FORCE:
+			return k_smallest(self.points[:len(self.items)], point, k)
+
+		k = min(k, len(self.items))
+		center = self.cell(point)
+		reach = max(abs(center[0] - self.min_cell[0]), abs(center[0] - self.max_cell[0]),
+			abs(center[1] - self.min_cell[1]), abs(center[1] - self.max_cell[1]))
+		candidates = []
+
+		for distance in range(reach + 1):
+			candidates.extend(self.ring(center, distance))
+
+			if len(candidates) < k:
+				continue
+
+			# Nodes outside the visited rings are at least this far away
+			ids = np.asarray(candidates)
+			nearest = ids[k_smallest(self.points[ids], point, k)]
+			farthest = np.hypot(*(self.points[nearest[-1]] - point))
+
+			if farthest <= distance * self.cell_size:
+				return nearest
+
+		ids = np.asarray(candidates)
+
+		return ids[k_smallest(self.points[ids], point, k)]
+
+	def within(self, point, radius):
+		"""Identifiers of the nodes at most at the given radius from the point.
+
+		Parameters
+		----------
+		point : tuple
+			Center of the search.
+		radius : float
+			Radius of the search.
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the nodes sorted by distance.
+		"""
+		if len(self.items) == 0:
+			return np.zeros(0, dtype=int)
+
+		(x_min, y_min), (x_max, y_max) = self.cell((point[0] - radius, point[1] - radius)), \
+			self.cell((point[0] + radius, point[1] + radius))
+		candidates = []
+
+		for x in range(max(x_min, self.min_cell[0]), min(x_max, self.max_cell[0]) + 1):
+			for y in range(max(y_min, self.min_cell[1]), min(y_max, self.max_cell[1]) + 1):
+				candidates.extend(self.cells.get((x, y), []))
+
+		ids = np.asarray(candidates, dtype=int)
+		distances = np.hypot(self.points[ids, 0] - point[0], self.points[ids, 1] - point[1])
+		order = np.argsort(distances, kind='stable')
+
+		return ids[order][distances[order] <= radius]
+
+class EdgeIndex():
+	"""
+	A uniform grid of buckets over the edges of the roadmap.
+
+	Each edge is kept in every bucket its segment crosses, so the edges
+	near a region or a point are found by visiting only the buckets
+	around them, regardless of the size of the roadmap. A long diagonal
+	edge takes a number of buckets proportional to its length, not to
+	the area of its bounding box.
+
+	Attributes
+	----------
+	cell_size : int
+		Width and height of each bucket in pixels.
+	"""
+
+	def __init__(self, cell_size=40):
+		self.cell_size = cell_size
+		self.cells = {}
+
+		# Ends as (x1, y1, x2, y2), and bounding boxes as (left, top, right, bottom)
+		self.segments = np.zeros((64, 4))
+		self.boxes = np.zeros((64, 4))
+		self.items = []
+
+		# Bounds of the non-empty buckets
+		self.min_cell = None
+		self.max_cell = None
+
+	def __len__(self):
+		return len(self.items)
+
+	def insert(self, p1, p2, item=None):
+		"""Adds the segment between two points to the index.
+
+		Parameters
+		----------
+		p1 : tuple
+			First end of the edge.
+		p2 : tuple
+			Second end of the edge.
+		item : object
+			Value returned for the edge, e.g. its identifier in the roadmap.
+
+		Returns
+		-------
+		int
+			Identifier of the edge within the index.
+		"""
+		id_ = len(self.items)
+
+		if id_ == len(self.boxes):
+			self.segments = np.concatenate((self.segments, np.zeros_like(self.segments)))
+			self.boxes = np.concatenate((self.boxes, np.zeros_like(self.boxes)))
+
+		box = min(p1[0], p2[0]), min(p1[1], p2[1]), max(p1[0], p2[0]), max(p1[1], p2[1])
+		self.segments[id_] = p1[0], p1[1], p2[0], p2[1]
+		self.boxes[id_] = box
+		self.items.append(item)
+
+		# Same walk as traversed, without the overhead of numpy for a single segment
+		(x1, y1), (x2, y2) = (p2, p1) if p1[0] > p2[0] else (p1, p2)
+		dx, dy = x2 - x1, y2 - y1
+		cells = []
+
+		for column in range(int(x1 // self.cell_size), int(x2 // self.cell_size) + 1):
+			left = max(x1, column * self.cell_size)
+			right = min(x2, (column + 1) * self.cell_size)
+			top = y1 if dx == 0 else y1 + (left - x1) * dy / dx
+			bottom = y2 if dx == 0 else y1 + (right - x1) * dy / dx
+			low, high = min(top, bottom) // self.cell_size, max(top, bottom) // self.cell_size
+			cells.extend((column, row) for row in range(int(low), int(high) + 1))
+
+		for cell in cells:
+			self.cells.setdefault(cell, []).append(id_)
+
+		rows = [row for _, row in cells]
+		self.bound(low=(cells[0][0], min(rows)), high=(cells[-1][0], max(rows)))
+
+		return id_
+
+	def extend(self, starts, ends, items):
+		"""Adds many segments to the index at once.
+
+		Parameters
+		----------
+		starts : numpy.ndarray
+			First end of each edge, shape (n, 2).
+		ends : numpy.ndarray
+			Second end of each edge, shape (n, 2).
+		items : list
+			Value returned for each edge.
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the edges within the index.
+		"""
+		starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+		ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+		first, last = len(self.items), len(self.items) + len(starts)
+
+		if len(starts) == 0:
+			return np.zeros(0, dtype=int)
+
+		if last > len(self.boxes):
+			size = max(last, 2*len(self.boxes))
+			segments, boxes = np.zeros((size, 4)), np.zeros((size, 4))
+			segments[:first], boxes[:first] = self.segments[:first], self.boxes[:first]
+			self.segments, self.boxes = segments, boxes
+
+		self.segments[first:last] = np.hstack((starts, ends))
+		self.boxes[first:last] = np.hstack((np.minimum(starts, ends), np.maximum(starts, ends)))
+		self.items.extend(items)
+
+		rows, cells = self.traversed(self.segments[first:last])
+		ids = rows + first
+		self.bound(low=tuple(cells.min(axis=0).tolist()), high=tuple(cells.max(axis=0).tolist()))
+
+		# Group the new identifiers by bucket, keeping them in increasing order
+		order = np.lexsort((ids, cells[:, 1], cells[:, 0]))
+		cells, ids = cells[order], ids[order]
+		breaks = np.flatnonzero(np.any(np.diff(cells, axis=0) != 0, axis=1)) + 1
+
+		for cell, group in zip(cells[np.r_[0, breaks]].tolist(), np.split(ids, breaks)):
+			self.cells.setdefault(tuple(cell), []).extend(group.tolist())
+
+		return np.arange(first, last)
+
+	def traversed(self, segments):
+		"""Buckets crossed by each segment.
+
+		Each segment is cut at the borders of the columns of buckets it
+		spans, and each piece takes the buckets of its column between
+		the rows of its ends.
+
+		Parameters
+		----------
+		segments : numpy.ndarray
+			Ends of the segments as (x1, y1, x2, y2), shape (n, 4).
+
+		Returns
+		-------
+		numpy.ndarray
+			Index in segments of each bucket, shape (m,).
+		numpy.ndarray
+			Buckets as (x, y), shape (m, 2).
+		"""
+		# Ends sorted from left to right
+		swap = segments[:, 0] > segments[:, 2]
+		starts = np.where(swap[:, None], segments[:, 2:], segments[:, :2])
+		ends = np.where(swap[:, None], segments[:, :2], segments[:, 2:])
+		(x1, y1), (x2, y2) = starts.T, ends.T
+
+		# One row per column of buckets spanned by each segment
+		first, last = (x1 // self.cell_size).astype(int), (x2 // self.cell_size).astype(int)
+		counts = last - first + 1
+		rows = np.repeat(np.arange(len(segments)), counts)
+		columns = first[rows] + np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+		# Ends of the piece within each column, exact when the ends are integers
+		left = np.maximum(x1[rows], columns * self.cell_size)
+		right = np.minimum(x2[rows], (columns + 1) * self.cell_size)
+		dx, dy = (x2 - x1)[rows], (y2 - y1)[rows]
+
+		with np.errstate(divide='ignore', invalid='ignore'):
+			top = np.where(dx == 0, y1[rows], y1[rows] + (left - x1[rows]) * dy / dx)
+			bottom = np.where(dx == 0, y2[rows], y1[rows] + (right - x1[rows]) * dy / dx)
+
+		low = (np.minimum(top, bottom) // self.cell_size).astype(int)
+		counts = (np.maximum(top, bottom) // self.cell_size).astype(int) - low + 1
+
+		# One row per bucket of each piece
+		pieces = np.repeat(np.arange(len(rows)), counts)
+		offsets = np.arange(len(pieces)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+		return rows[pieces], np.column_stack((columns[pieces], low[pieces] + offsets))
+
+	def bound(self, low, high):
+		"""Extends the bounds of the non-empty buckets to the given ones."""
+		if self.min_cell is None:
+			self.min_cell, self.max_cell = low, high
+		else:
+			self.min_cell = min(self.min_cell[0], low[0]), min(self.min_cell[1], low[1])
+			self.max_cell = max(self.max_cell[0], high[0]), max(self.max_cell[1], high[1])
+
+	def covered(self, box):
+		"""Buckets overlapped by the given box."""
+		left, top, right, bottom = box
+		x_min, y_min = int(left // self.cell_size), int(top // self.cell_size)
+		x_max, y_max = int(right // self.cell_size), int(bottom // self.cell_size)
+
+		return [(x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
+
+	def intersecting(self, box):
+		"""Identifiers of the edges whose bounding box overlaps the given box.
+
+		A bounding box may overlap the box away from the buckets the edge
+		crosses, so the bounding boxes of every edge are compared at once
+		rather than through the buckets. Use crossing for the edges that
+		actually pass through the box.
+
+		Parameters
+		----------
+		box : tuple
+			Region as (left, top, right, bottom).
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the edges within the index, in increasing order.
+		"""
+		left, top, right, bottom = box
+		boxes = self.boxes[:len(self.items)]
+		overlap = (boxes[:, 0] <= right) & (boxes[:, 2] >= left) & (boxes[:, 1] <= bottom) & \
+			(boxes[:, 3] >= top)
+
+		return np.flatnonzero(overlap)
+
+	def crossing(self, box):
+		"""Identifiers of the edges whose segment crosses the given box.
+
+		Parameters
+		----------
+		box : tuple
+			Region as (left, top, right, bottom).
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the edges within the index, in increasing order.
+		"""
+		candidates = set()
+
+		for cell in self.covered(box):
+			candidates.update(self.cells.get(cell, ()))
+
+		ids = np.fromiter(candidates, dtype=int, count=len(candidates))
+		ids.sort()
+		starts, ends = self.segments[ids, :2], self.segments[ids, 2:]
+		low, high = np.array(box[:2], dtype=float), np.array(box[2:], dtype=float)
+		direction = ends - starts
+
+		# Clipping of each segment by the slabs of the box, ends included
+		with np.errstate(divide='ignore', invalid='ignore'):
+			t1, t2 = (low - starts) / direction, (high - starts) / direction
+
+		inside = (low <= starts) & (starts <= high)
+		parallel = direction == 0
+		t_enter = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+		t_exit = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+		t_enter, t_exit = t_enter.max(axis=1), t_exit.min(axis=1)
+
+		return ids[(t_enter <= t_exit) & (t_enter <= 1) & (t_exit >= 0)]
+
+	def nearest(self, point, k=1):
+		"""Given k, it returns the k-nearest edges to the point.
+
+		Buckets are visited ring by ring around the point, until no edge
+		outside the visited rings can be closer.
+
+		Parameters
+		----------
+		point : tuple
+			Point to search its nearest edges.
+		k : int
+			Number of edges.
+
+		Returns
+		-------
+		numpy.ndarray
+			Identifiers of the k-nearest edges sorted by distance.
+		"""
+		k = min(k, len(self.items))
+
+		if k == 0:
+			return np.zeros(0, dtype=int)
+
+		center = int(point[0] // self.cell_size), int(point[1] // self.cell_size)
+		reach = max(abs(center[0] - self.min_cell[0]), abs(center[0] - self.max_cell[0]),
+			abs(center[1] - self.min_cell[1]), abs(center[1] - self.max_cell[1]))
+		candidates = set()
+
+		for distance in range(reach + 1):
+			for cell in ring(center, distance, self.min_cell, self.max_cell):
+				candidates.update(self.cells.get(cell, ()))
+
+			if len(candidates) < k:
+				continue
+
+			# Edges outside the visited rings are at least this far away
+			ids = np.fromiter(candidates, dtype=int, count=len(candidates))
+			distances = segment_distances(self.segments[ids], point)[0]
+			order = np.argsort(distances, kind='stable')[:k]
+
+			if distances[order[-1]] <= distance * self.cell_size:
+				return ids[order]
+
+		return ids[order]
@@ -0,0 +1,128 @@
+import math
+import time
+import roadmap
+
+class Termination():
+	"""
+	Decides when the construction of the roadmap stops.
+
+	After ntry consecutive samples seen by some guard, the fraction of the
+	free space left uncovered is below 1 - (1 - confidence)^(1/ntry) with
+	the given confidence. Such lower bound of the coverage is updated after
+	every sample, and the construction stops as soon as any of the enabled
+	criteria is met.
+
+	Attributes
+	----------
+	M : int
+		Maximum number of consecutive failures to insert a guard node,
+		None to ignore it.
+	coverage : float
+		Target fraction of the free space covered, None to ignore it.
+	confidence : float
+		Confidence of the coverage estimate.
+	max_samples : int
+		Budget of free samples, None for no budget.
+	max_seconds : float
+		Budget of wall-clock time, None for no budget.
+	start : tuple
+		Initial position of a query, stopping once it is connected to goal.
+	goal : tuple
+		End position of that query.
+
+	Raises
+	------
+	ValueError
+		If the coverage or the confidence is not between 0 and 1.
+	"""
+
+	def __init__(self, M=None, coverage=None, confidence=0.95, max_samples=None,
+		max_seconds=None, start=None, goal=None):
+		if coverage is not None and not 0 < coverage < 1:
+			raise ValueError(f'Coverage must be between 0 and 1, not {coverage}')
+
+		if not 0 < confidence < 1:
+			raise ValueError(f'Confidence must be between 0 and 1, not {confidence}')
+
+		self.M = M
+		self.coverage = coverage
+		self.confidence = confidence
+		self.max_samples = max_samples
+		self.max_seconds = max_seconds
+		self.start = start
+		self.goal = goal
+		self.anchors = None
+
+		# Consecutive failures needed to reach the target coverage
+		if coverage is None:
+			self.required = math.inf
+		else:
+			self.required = math.log(1 - confidence) / math.log(coverage)
+
+		self.samples = 0
+		self.started = time.perf_counter()
+		self.estimate = 0.0
+		self.connected = False
+		self.reason = None
+
+	def reset(self, planner):
+		"""Starts counting the samples and the time from now on.
+
+		Parameters
+		----------
+		planner : VisibilityPRM
+			Planner whose roadmap is about to be built.
+		"""
+		self.samples = 0
+		self.started = time.perf_counter()
+		self.estimate = self.coverage_bound(planner.ntry)
+		self.reason = None
+
+		if self.start is not None:
+			self.anchors = roadmap.Anchors(roadmap=planner.graph.roadmap,
+				components=planner.components, collider=planner.graph.collider,
+				start=self.start, goal=self.goal)
+			self.connected = self.anchors.joined()
+
+	def coverage_bound(self, ntry):
+		"""Fraction of the free space covered, with the given confidence."""
+		return (1 - self.confidence)**(1/ntry) if ntry > 0 else 0.0
+
+	def update(self, planner, result):
+		"""Accounts for a sample once the visibility rule was applied to it.
+
+		Parameters
+		----------
+		planner : VisibilityPRM
+			Planner whose roadmap is built.
+		result : str
+			Either 'guard', 'connection' or 'rejected'.
+		"""
+		self.samples += 1
+		self.estimate = self.coverage_bound(planner.ntry)
+
+		# Components only change when a node is inserted
+		if self.anchors is not None and result != 'rejected':
+			self.connected = self.anchors.joined()
+
+	def done(self, planner):
+		"""Checks every criterion, keeping in reason the one that was met.
+
+		Returns
+		-------
+		bool
+			True if the construction must stop.
+		"""
+		if self.M is not None and planner.ntry >= self.M:
+			self.reason = 'M'
+		elif planner.ntry >= self.required:
+			self.reason = 'coverage'
+		elif self.connected:
+			self.reason = 'connected'
+		elif self.max_samples is not None and self.samples >= self.max_samples:
+			self.reason = 'samples'
+		elif self.max_seconds is not None and \
+			time.perf_counter() - self.started >= self.max_seconds:
+			self.reason = 'seconds'
+
+		return self.reason is not None
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules of the planner live in the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Windows open on the dummy video driver, so nothing shows up on screen
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+
+SUITE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks',
+	'run.py')
+
+def run(output):
+	"""Runs the whole suite on tiny roadmaps and returns its report."""
+	subprocess.run([sys.executable, SUITE, '--output', str(output), '--M', '3', '--queries', '5',
+		'--checks', '10'], check=True, capture_output=True)
+
+	with open(output) as file:
+		return json.load(file)
+
+def test_report(tmp_path):
+	report = run(tmp_path / 'first.json')
+
+	assert report['parameters']['seed'] == 0
+	assert len(report['maps']) == len({result['name'] for result in report['maps']}) > 1
+
+	for result in report['maps']:
+		construction = result['construction']
+		assert construction['guards'] > 0
+		assert construction['samples'] >= construction['guards'] + construction['connections']
+		assert result['collision']['is_free_per_second'] > 0
+		assert 0 <= result['queries']['query_success_rate'] <= 1
+
+	# Timings aside, the same seed gives the same roadmaps and queries
+	def counts(report):
+		return [(result['construction']['samples'], result['construction']['guards'],
+			result['queries']['query_success_rate']) for result in report['maps']]
+
+	assert counts(run(tmp_path / 'second.json')) == counts(report)
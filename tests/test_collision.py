@@ -0,0 +1,120 @@
+import numpy as np
+import pygame
+import pytest
+import collision
+import shapes
+
+OBSTACLES = [pygame.Rect(350, 200, 150, 50), pygame.Rect(400, 200, 50, 150),
+	pygame.Rect(150, 20, 50, 150), pygame.Rect(150, 120, 150, 50)]
+
+def sampled_cross_obstacle(collider, p1, p2, steps=1000):
+	"""Checks the robot at many points along the segment instead."""
+	return any(not collider.is_free(point=(p1[0] + t*(p2[0] - p1[0]), p1[1] + t*(p2[1] - p1[1])))
+		for t in np.linspace(0, 1, steps + 1))
+
+def test_cross_obstacle_matches_sampling():
+	rng = np.random.default_rng(0)
+	collider = collision.RectangleCollider(obstacles=OBSTACLES, radius=10)
+	segments = rng.integers(low=0, high=(640, 480, 640, 480), size=(200, 4)).tolist()
+
+	exact = np.array([collider.cross_obstacle(p1=(x1, y1), p2=(x2, y2))
+		for x1, y1, x2, y2 in segments])
+	sampled = np.array([sampled_cross_obstacle(collider, p1=(x1, y1), p2=(x2, y2))
+		for x1, y1, x2, y2 in segments])
+
+	# Sampling misses at most a corner thinner than its step
+	assert exact[sampled].all()
+	assert (exact != sampled).sum() <= 2
+	assert 20 < exact.sum() < 180
+
+def test_cross_obstacle_boundaries():
+	collider = collision.RectangleCollider(obstacles=[pygame.Rect(100, 100, 50, 50)], radius=0)
+
+	assert collider.cross_obstacle(p1=(50, 125), p2=(200, 125))
+	assert collider.cross_obstacle(p1=(125, 125), p2=(125, 125))
+	assert collider.cross_obstacle(p1=(50, 60), p2=(140, 160))
+
+	# Touching the obstacle is not a collision
+	assert not collider.cross_obstacle(p1=(50, 100), p2=(200, 100))
+	assert not collider.cross_obstacle(p1=(50, 50), p2=(100, 100))
+	assert not collider.cross_obstacle(p1=(50, 50), p2=(90, 200))
+
+def test_batch_matches_single_segments():
+	rng = np.random.default_rng(1)
+	collider = collision.RectangleCollider(obstacles=OBSTACLES, radius=10)
+	starts = rng.integers(low=0, high=(640, 480), size=(300, 2))
+	ends = rng.integers(low=0, high=(640, 480), size=(300, 2))
+
+	single = [collider.cross_obstacle(p1=tuple(p1), p2=tuple(p2))
+		for p1, p2 in zip(starts.tolist(), ends.tolist())]
+	assert collider.cross_obstacles(starts=starts, ends=ends).tolist() == single
+
+	# A shared start, as when checking a sample against every guard
+	shared = [collider.cross_obstacle(p1=tuple(starts[0]), p2=tuple(p2)) for p2 in ends.tolist()]
+	assert collider.cross_obstacles(starts=starts[0], ends=ends).tolist() == shared
+
+	assert collider.cross_obstacles(starts=starts[0], ends=np.zeros((0, 2))).shape == (0,)
+
+def random_rectangles(rng, n=40):
+	corners = rng.integers(low=0, high=(600, 440), size=(n, 2))
+	sizes = rng.integers(low=5, high=80, size=(n, 2))
+
+	return [pygame.Rect(x, y, w, h) for (x, y), (w, h) in zip(corners.tolist(), sizes.tolist())]
+
+@pytest.mark.parametrize('radius', [0, 5])
+@pytest.mark.parametrize('leaf_size', [1, 8])
+def test_shapes_match_rectangles(radius, leaf_size):
+	rng = np.random.default_rng(radius + leaf_size)
+	obstacles = random_rectangles(rng)
+	exact = collision.RectangleCollider(obstacles=obstacles, radius=radius)
+	hierarchy = collision.ShapeCollider(obstacles=obstacles, radius=radius, leaf_size=leaf_size)
+
+	points = rng.integers(low=0, high=(640, 480), size=(2000, 2))
+	assert np.array_equal(hierarchy.are_free(points=points), exact.are_free(points=points))
+
+	for point in points[:50].tolist():
+		assert hierarchy.is_free(point=tuple(point)) == exact.is_free(point=tuple(point))
+
+	starts, ends = points[:1000], points[1000:]
+	assert np.array_equal(hierarchy.cross_obstacles(starts=starts, ends=ends),
+		exact.cross_obstacles(starts=starts, ends=ends))
+	assert np.array_equal(hierarchy.cross_obstacles(starts=starts[0], ends=ends),
+		exact.cross_obstacles(starts=starts[0], ends=ends))
+
+	for p1, p2 in zip(starts[:50].tolist(), ends[:50].tolist()):
+		assert hierarchy.cross_obstacle(p1=tuple(p1), p2=tuple(p2)) == \
+			exact.cross_obstacle(p1=tuple(p1), p2=tuple(p2))
+
+def test_concave_polygon():
+	# A U shape, whose notch is free
+	u = shapes.Polygon([(100, 100), (300, 100), (300, 300), (250, 300), (250, 150), (150, 150),
+		(150, 300), (100, 300)])
+	collider = collision.ShapeCollider(obstacles=[u], radius=0)
+
+	assert not collider.is_free(point=(120, 200))
+	assert not collider.is_free(point=(200, 120))
+	assert collider.is_free(point=(200, 250))
+	assert collider.is_free(point=(50, 50))
+
+	# Down the notch, and across both arms
+	assert not collider.cross_obstacle(p1=(200, 400), p2=(200, 160))
+	assert collider.cross_obstacle(p1=(50, 250), p2=(350, 250))
+
+def test_circle_is_conservative():
+	circle = shapes.Circle(center=(200, 200), radius=50)
+	collider = collision.ShapeCollider(obstacles=[circle], radius=3)
+
+	angles = np.linspace(0, 2*np.pi, 64, endpoint=False)
+	inside = 200 + np.column_stack((np.cos(angles), np.sin(angles))) * 52
+	outside = 200 + np.column_stack((np.cos(angles), np.sin(angles))) * 60
+
+	assert not collider.are_free(points=inside).any()
+	assert collider.are_free(points=outside).all()
+
+	# The bounding box holds the whole polygon, whose corners stick out of the circle
+	for sides in (5, 6, 32):
+		circle = shapes.Circle(center=(200, 200), radius=50, sides=sides)
+		vertices = circle.triangles().reshape(-1, 2)
+		assert (vertices >= np.array([circle.left, circle.top]) - 1e-9).all()
+		assert (vertices <= np.array([circle.right, circle.bottom]) + 1e-9).all()
+		assert np.isclose(vertices[:, 0].max(), circle.right)
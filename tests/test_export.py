@@ -0,0 +1,50 @@
+import numpy as np
+import pygame
+import pytest
+import environment
+import export
+import planner
+import renderer
+
+START, GOAL = (50, 50), (540, 380)
+
+@pytest.fixture
+def renderer_():
+	pygame.init()
+	environment_ = environment.Environment(map_dimensions=(640, 480))
+	environment_.make_obstacles()
+
+	planner_ = planner.VisibilityPRM(map_dimensions=(640, 480), radius=10,
+		obstacles=environment_.sides, M=30, seed=0)
+	renderer_ = renderer.Renderer(environment=environment_, graph=planner_.graph)
+	planner_.observers.append(renderer_)
+	planner_.build()
+	planner_.graph.follow(path=planner_.query(start=START, goal=GOAL))
+
+	yield renderer_
+	pygame.quit()
+
+def test_frames(renderer_, tmp_path):
+	frames = export.export(renderer_=renderer_, output=str(tmp_path / 'serial.npy'),
+		keep_roadmap=True)
+	array = np.load(tmp_path / 'serial.npy', mmap_mode='r')
+
+	# A frame per drawn event, the roadmap, each position of the robot and the path
+	drawn = sum(event != 'rejected' for event, _, _ in renderer_.events)
+	assert frames == drawn + 1 + len(renderer_.graph.smooth) + 1
+	assert array.shape == (frames, 480, 640, 3)
+
+	# The path is only drawn on the last frame
+	def red(frame):
+		return (frame == renderer_.graph.RED).all(axis=2).any()
+
+	assert red(array[-1]) and not red(array[drawn - 1])
+	assert not np.array_equal(array[0], array[drawn - 1])
+
+	# The same frames, as images written by two processes
+	assert export.export(renderer_=renderer_, output=str(tmp_path / 'frames'),
+		keep_roadmap=True, workers=2) == frames
+
+	for number in (0, drawn, frames - 1):
+		surface = pygame.image.load(str(tmp_path / 'frames' / f'frame_{number:06d}.png'))
+		assert np.array_equal(pygame.surfarray.array3d(surface).swapaxes(0, 1), array[number])
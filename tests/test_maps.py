@@ -0,0 +1,96 @@
+import pickle
+import numpy as np
+import pygame
+import pytest
+import maps
+import occupancy_grid
+
+# Blocked cells of every map, as two rectangles
+RECTANGLES = [pygame.Rect(10, 5, 20, 10), pygame.Rect(40, 25, 15, 10)]
+BLOCKED = np.zeros((40, 64), dtype=bool)
+
+for rectangle in RECTANGLES:
+	BLOCKED[rectangle.top:rectangle.bottom, rectangle.left:rectangle.right] = True
+
+# Gray levels of a ROS map image: occupied black, free white
+LEVELS = np.where(BLOCKED, 0, 254).astype(np.uint8)
+
+def write_pgm(path, levels, maximum=255):
+	dtype = np.uint8 if maximum < 256 else np.dtype('>u2')
+
+	with open(path, 'wb') as file:
+		file.write(f'P5\n# occupancy map\n{levels.shape[1]} {levels.shape[0]}\n{maximum}\n'.encode())
+		file.write(levels.astype(dtype).tobytes())
+
+def write_png(path, levels, depth):
+	surface = pygame.Surface(size=levels.shape[::-1], depth=depth)
+
+	if depth == 8:
+		surface.set_palette([(level, level, level) for level in range(256)])
+		pygame.surfarray.pixels2d(surface)[:] = levels.T
+	else:
+		pygame.surfarray.pixels3d(surface)[:] = levels.T[:, :, None]
+
+	pygame.image.save(surface, str(path))
+
+def write_yaml(path, image, negate=0):
+	with open(path, 'w') as file:
+		file.write(f'image: {image}\nresolution: 0.05\norigin: [0.0, 0.0, 0.0]\n'
+			f'negate: {negate}\noccupied_thresh: 0.65\nfree_thresh: 0.196  # free below\n')
+
+@pytest.fixture(params=['bool.npy', 'ros.npy', '8.pgm', '16.pgm', '24.png', '24.yaml', '8.png',
+	'8.yaml', 'negate.yaml'])
+def path(request, tmp_path):
+	name = request.param
+	path = tmp_path / name
+
+	if name == 'bool.npy':
+		np.save(path, BLOCKED)
+	elif name == 'ros.npy':
+		np.save(path, np.where(BLOCKED, 100, 0).astype(np.int8))
+	elif name == '8.pgm':
+		write_pgm(path, LEVELS)
+	elif name == '16.pgm':
+		write_pgm(path, LEVELS.astype(np.uint16) * 257, maximum=65535)
+	elif name.endswith('.png'):
+		write_png(path, LEVELS, depth=int(name[:-4]))
+	elif name.endswith('.yaml') and name != 'negate.yaml':
+		write_png(tmp_path / 'map.png', LEVELS, depth=int(name[:-5]))
+		write_yaml(path, image='map.png')
+	else:
+		write_pgm(tmp_path / 'map.pgm', 255 - LEVELS)
+		write_yaml(path, image='map.pgm', negate=1)
+
+	return str(path)
+
+def test_load(path):
+	grid_map = maps.load(path)
+
+	assert (grid_map.HEIGHT, grid_map.WIDTH) == BLOCKED.shape
+	assert np.array_equal(grid_map.rows(0, grid_map.HEIGHT), BLOCKED)
+	assert pickle.loads(pickle.dumps(grid_map)).fingerprint() == grid_map.fingerprint()
+
+def test_unknown_cells_are_blocked(tmp_path):
+	levels = LEVELS.copy()
+	levels[:, -4:] = 205
+	write_pgm(tmp_path / 'map.pgm', levels)
+	write_yaml(tmp_path / 'map.yaml', image='map.pgm')
+
+	assert maps.load(str(tmp_path / 'map.yaml')).rows(0, 40)[:, -4:].all()
+
+@pytest.mark.parametrize('radius', [1, 5])
+def test_inflation_matches_rectangles(tmp_path, radius):
+	np.save(tmp_path / 'map.npy', BLOCKED)
+	grid_map = maps.load(str(tmp_path / 'map.npy'))
+	expected = occupancy_grid.OccupancyGrid(obstacles=RECTANGLES, radius=radius,
+		map_dimensions=(64, 40)).grid
+
+	# In memory and in a file, and in blocks of a few rows
+	for max_cells in (2**26, 1):
+		collider = occupancy_grid.OccupancyGrid(obstacles=[], radius=radius,
+			map_dimensions=(64, 40), grid_map=grid_map, max_cells=max_cells)
+		assert np.array_equal(collider.grid, expected)
+
+		collider.grid[:] = False
+		collider.inflate(grid_map=grid_map, block_cells=200)
+		assert np.array_equal(collider.grid, expected)
@@ -0,0 +1,38 @@
+import numpy as np
+import pygame
+import collision
+import occupancy_grid
+
+OBSTACLES = [pygame.Rect(350, 200, 150, 50), pygame.Rect(400, 200, 50, 150),
+	pygame.Rect(150, 20, 50, 150), pygame.Rect(150, 120, 150, 50)]
+
+def test_pixels_match_rectangles():
+	exact = collision.RectangleCollider(obstacles=OBSTACLES, radius=10)
+	grid = occupancy_grid.OccupancyGrid(obstacles=OBSTACLES, radius=10, map_dimensions=(640, 480))
+
+	# Every pixel around the corners of the inflated obstacles, and others at random
+	corners = [(x + dx, y + dy) for obstacle in OBSTACLES
+		for x in (obstacle.left - 10, obstacle.right + 10)
+		for y in (obstacle.top - 10, obstacle.bottom + 10)
+		for dx in range(-2, 3) for dy in range(-2, 3)]
+	points = corners + [tuple(point) for point in
+		np.random.default_rng(0).integers(low=0, high=(640, 480), size=(3000, 2)).tolist()]
+
+	for point in points:
+		assert grid.is_free(point=point) == exact.is_free(point=point)
+
+def test_segments_match_rectangles():
+	rng = np.random.default_rng(1)
+	exact = collision.RectangleCollider(obstacles=OBSTACLES, radius=10)
+	grid = occupancy_grid.OccupancyGrid(obstacles=OBSTACLES, radius=10, map_dimensions=(640, 480))
+	starts = rng.integers(low=0, high=(640, 480), size=(500, 2))
+	ends = rng.integers(low=0, high=(640, 480), size=(500, 2))
+
+	expected = np.array([exact.cross_obstacle(p1=tuple(p1), p2=tuple(p2))
+		for p1, p2 in zip(starts.tolist(), ends.tolist())])
+	crossed = grid.cross_obstacles(starts=starts, ends=ends)
+
+	# Accurate up to a pixel, so only segments grazing a corner may differ
+	assert (crossed != expected).sum() <= 5
+	assert crossed.tolist() == [grid.cross_obstacle(p1=tuple(p1), p2=tuple(p2))
+		for p1, p2 in zip(starts.tolist(), ends.tolist())]
@@ -0,0 +1,25 @@
+import numpy as np
+import pygame
+import planner
+
+def make_planner(seed=0):
+	"""Planner on a dense map of random rectangles, which needs many guards."""
+	rng = np.random.default_rng(seed)
+	corners = rng.integers(low=0, high=(600, 440), size=(60, 2))
+	obstacles = [pygame.Rect(x, y, 40, 40) for x, y in corners.tolist()]
+
+	return planner.VisibilityPRM(map_dimensions=(640, 480), radius=3, obstacles=obstacles,
+		M=100, seed=seed)
+
+def test_parallel_build_matches_serial():
+	serial = make_planner().build()
+	parallel = make_planner().build(workers=2)
+
+	# Past the first capacity, the roadmap has reallocated its arrays
+	assert len(serial.guards) + len(serial.connections) > 64
+	assert serial.guards == parallel.guards
+	assert serial.connections == parallel.connections
+
+	roadmap1, roadmap2 = serial.graph.roadmap, parallel.graph.roadmap
+	assert np.array_equal(roadmap1.points[:roadmap1.n_nodes], roadmap2.points[:roadmap2.n_nodes])
+	assert np.array_equal(roadmap1.edges[:roadmap1.n_edges], roadmap2.edges[:roadmap2.n_edges])
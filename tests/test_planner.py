@@ -0,0 +1,196 @@
+import json
+import math
+import os
+import subprocess
+import sys
+import numpy as np
+import pygame
+import pytest
+import collision
+import instrumentation
+import planner
+import termination
+
+OBSTACLES = [pygame.Rect(350, 200, 150, 50), pygame.Rect(400, 200, 50, 150),
+	pygame.Rect(150, 20, 50, 150), pygame.Rect(150, 120, 150, 50)]
+START, GOAL = (50, 50), (540, 380)
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+	'visibility_prm.py')
+
+def make_planner(radius=10, M=30, seed=0):
+	"""Planner on the default map, drawing its samples from the given seed."""
+	return planner.VisibilityPRM(map_dimensions=(640, 480), radius=radius, obstacles=OBSTACLES,
+		M=M, seed=seed)
+
+def check_path(path, start, goal, radius=10):
+	"""Checks that the path joins both ends without crossing any obstacle."""
+	collider = collision.RectangleCollider(obstacles=OBSTACLES, radius=radius)
+
+	assert path[0] == start and path[-1] == goal
+	for p1, p2 in zip(path[:-1], path[1:]):
+		assert not collider.cross_obstacle(p1=p1, p2=p2)
+
+def test_build_and_query():
+	planner_ = make_planner().build()
+
+	assert planner_.ntry == 30
+	assert planner_.coverage == 1 - 1/30
+	assert len(planner_.guards) > 1
+
+	check_path(planner_.query(start=START, goal=GOAL), start=START, goal=GOAL)
+
+def test_queries_leave_the_roadmap_unchanged():
+	planner_ = make_planner().build()
+	roadmap_ = planner_.graph.roadmap
+	n_nodes, n_edges = roadmap_.n_nodes, roadmap_.n_edges
+
+	queries = [(START, GOAL), (GOAL, START), ((600, 50), (50, 450)), ((20, 460), (620, 20))]
+	paths = planner_.query_many(queries)
+
+	assert (roadmap_.n_nodes, roadmap_.n_edges) == (n_nodes, n_edges)
+	assert paths == [planner_.query(start=start, goal=goal) for start, goal in queries]
+
+	for (start, goal), path in zip(queries, paths):
+		check_path(path, start=start, goal=goal)
+
+	# The goal is inside an obstacle
+	assert planner_.query(start=START, goal=(420, 220)) is None
+
+def test_save_and_load(tmp_path):
+	planner_ = make_planner().build()
+	planner_.save(str(tmp_path))
+	loaded = make_planner(seed=1).load(str(tmp_path))
+
+	roadmap_, loaded_roadmap = planner_.graph.roadmap, loaded.graph.roadmap
+	n_nodes, n_edges = roadmap_.n_nodes, roadmap_.n_edges
+	assert (loaded_roadmap.n_nodes, loaded_roadmap.n_edges) == (n_nodes, n_edges)
+	assert np.array_equal(loaded_roadmap.points[:n_nodes], roadmap_.points[:n_nodes])
+	assert np.array_equal(loaded_roadmap.edges[:n_edges], roadmap_.edges[:n_edges])
+	assert (loaded.guards, loaded.connections, loaded.ntry) == \
+		(planner_.guards, planner_.connections, planner_.ntry)
+
+	# Nodes are in the same components
+	for node in range(n_nodes):
+		assert loaded.components.connected(node, planner_.components.find(node))
+
+	assert loaded.query(start=START, goal=GOAL) == planner_.query(start=START, goal=GOAL)
+
+	# The edge index built at once has the buckets of the one filled edge by edge
+	edge_index, loaded_index = planner_.graph.edge_index, loaded.graph.edge_index
+	assert loaded_index.cells == edge_index.cells
+	assert (loaded_index.min_cell, loaded_index.max_cell) == \
+		(edge_index.min_cell, edge_index.max_cell)
+	assert np.array_equal(loaded_index.segments[:n_edges], edge_index.segments[:n_edges])
+
+def test_load_rejects_stale_roadmaps(tmp_path):
+	make_planner().build().save(str(tmp_path))
+
+	with pytest.raises(ValueError, match='Stale roadmap'):
+		make_planner(radius=5).load(str(tmp_path))
+
+	stale = make_planner()
+	stale.graph.obstacles = OBSTACLES[:2]
+	with pytest.raises(ValueError, match='Stale roadmap'):
+		stale.load(str(tmp_path))
+
+def test_cli_rejects_stale_roadmaps(tmp_path):
+	command = [sys.executable, SCRIPT, '--headless', '-M', '5']
+	subprocess.run(command + ['-sr', str(tmp_path)], check=True, capture_output=True)
+
+	result = subprocess.run(command + ['-r', '5', '-lr', str(tmp_path)], capture_output=True,
+		text=True)
+	assert result.returncode == 2
+	assert 'Stale roadmap' in result.stderr
+
+def same_roadmap(planner1, planner2):
+	roadmap1, roadmap2 = planner1.graph.roadmap, planner2.graph.roadmap
+
+	return roadmap1.n_nodes == roadmap2.n_nodes and roadmap1.n_edges == roadmap2.n_edges and \
+		np.array_equal(roadmap1.points[:roadmap1.n_nodes], roadmap2.points[:roadmap2.n_nodes]) and \
+		np.array_equal(roadmap1.edges[:roadmap1.n_edges], roadmap2.edges[:roadmap2.n_edges])
+
+def test_seed_reproduces_the_roadmap(tmp_path):
+	planner_ = make_planner(seed=None).build()
+	assert planner_.seed is not None
+
+	# The seed drawn for the run is enough to build the same roadmap again
+	assert same_roadmap(make_planner(seed=planner_.seed).build(), planner_)
+	assert not same_roadmap(make_planner(seed=planner_.seed + 1).build(), planner_)
+
+	planner_.save(str(tmp_path))
+	with open(tmp_path / 'header.json') as file:
+		assert json.load(file)['seed'] == planner_.seed
+
+def test_metrics_count_the_construction():
+	metrics = instrumentation.metrics
+	metrics.reset()
+	metrics.enabled = True
+
+	try:
+		planner_ = make_planner().build()
+	finally:
+		metrics.enabled = False
+
+	counters, calls = metrics.counters.copy(), metrics.calls.copy()
+	metrics.reset()
+
+	assert counters['guards'] == len(planner_.guards)
+	assert counters['connections'] == len(planner_.connections)
+
+	# One sample and one visibility check per step
+	samples = counters['guards'] + counters['connections'] + counters['rejected']
+	assert calls['sampling'] == calls['visibility'] == samples
+
+	# Nothing is recorded unless enabled
+	make_planner().build()
+	assert not metrics.counters and not metrics.calls
+
+def test_coverage_target():
+	termination_ = termination.Termination(coverage=0.9, confidence=0.95)
+
+	# Consecutive failures such that 0.05^(1/ntry) >= 0.9
+	assert termination_.required == pytest.approx(28.433, abs=1e-3)
+	assert termination_.coverage_bound(29) >= 0.9 > termination_.coverage_bound(28)
+
+	planner_ = make_planner(M=1000).build(termination_=termination_)
+	assert (termination_.reason, planner_.ntry) == ('coverage', 29)
+
+def test_budgets():
+	termination_ = termination.Termination(M=30)
+	make_planner(M=1000).build(termination_=termination_)
+	assert termination_.reason == 'M'
+
+	termination_ = termination.Termination(max_samples=50)
+	make_planner().build(termination_=termination_)
+	assert (termination_.reason, termination_.samples) == ('samples', 50)
+
+	termination_ = termination.Termination(coverage=0.99999, max_seconds=0.2)
+	make_planner().build(termination_=termination_)
+	assert termination_.reason == 'seconds'
+
+	termination_ = termination.Termination(start=START, goal=GOAL, max_samples=math.inf)
+	planner_ = make_planner().build(termination_=termination_)
+	assert termination_.reason == 'connected'
+	assert planner_.query(start=START, goal=GOAL) is not None
+
+@pytest.mark.parametrize('options', [{'coverage': 0}, {'coverage': -0.5}, {'coverage': 1},
+	{'coverage': 1.5}, {'confidence': 0}, {'confidence': 1}, {'confidence': 1.5}])
+def test_out_of_range_targets(options):
+	with pytest.raises(ValueError):
+		termination.Termination(**options)
+
+def test_anytime_stops_at_the_first_path():
+	planner_ = make_planner(M=100)
+	paths = planner_.anytime(start=START, goal=GOAL)
+	first = next(paths)
+	check_path(first, start=START, goal=GOAL)
+
+	# Construction is suspended as soon as start and goal are connected
+	termination_ = termination.Termination(start=START, goal=GOAL, max_samples=math.inf)
+	connected = make_planner(M=100).build(termination_=termination_)
+	assert connected.graph.roadmap.n_nodes == planner_.graph.roadmap.n_nodes
+
+	# Then goes on, each path shorter than the previous one
+	lengths = [sum(map(math.dist, path[:-1], path[1:])) for path in [first, *paths]]
+	assert all(shorter < longer for longer, shorter in zip(lengths, lengths[1:]))
+	assert planner_.termination.reason == 'M'
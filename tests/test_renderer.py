@@ -0,0 +1,58 @@
+import numpy as np
+import pygame
+import pytest
+import environment
+import planner
+import renderer
+
+START, GOAL = (50, 50), (540, 380)
+
+@pytest.fixture
+def environment_():
+	pygame.init()
+	environment_ = environment.Environment(map_dimensions=(640, 480))
+	environment_.make_obstacles()
+	yield environment_
+	pygame.quit()
+
+def make_renderer(environment_):
+	"""Renderer of a roadmap built on the environment, with a path to animate."""
+	planner_ = planner.VisibilityPRM(map_dimensions=(640, 480), radius=10,
+		obstacles=environment_.sides, M=30, seed=0)
+	renderer_ = renderer.Renderer(environment=environment_, graph=planner_.graph)
+	planner_.observers.append(renderer_)
+	planner_.build()
+	planner_.graph.follow(path=planner_.query(start=START, goal=GOAL))
+
+	return renderer_
+
+def test_animation_updates_dirty_rects(environment_, monkeypatch):
+	renderer_ = make_renderer(environment_)
+	shown, areas = [], []
+
+	def update(rectangles=None):
+		# Nothing may change outside the areas given to the display
+		pixels = pygame.surfarray.array3d(environment_.map)
+
+		if rectangles is not None:
+			changed = (pixels != shown[-1]).any(axis=2)
+			for rectangle in rectangles:
+				changed[rectangle.left:rectangle.right, rectangle.top:rectangle.bottom] = False
+
+			assert not changed.any()
+			areas.append(sum(rectangle.width * rectangle.height for rectangle in rectangles))
+
+		shown[:] = [pixels]
+
+	monkeypatch.setattr(pygame.display, 'update', update)
+	monkeypatch.setattr(renderer_, 'wait', lambda seconds, fps=50: True)
+
+	assert renderer_.animate(keep_roadmap=True, fps=1000)
+	assert len(areas) == len(renderer_.graph.smooth) > 0
+	assert max(areas) < 0.01 * 640 * 480
+
+	# The static layer is drawn once, and the path is shown at the end
+	layer = renderer_.layer(keep_roadmap=True)
+	assert renderer_.animate(keep_roadmap=True, fps=1000)
+	assert renderer_.layer(keep_roadmap=True) is layer
+	assert (shown[0] == renderer_.graph.RED).all(axis=2).any()
@@ -0,0 +1,67 @@
+import numpy as np
+import pygame
+import planner
+import shapes
+
+def make_planner():
+	"""Planner on the default map of the T and L obstacles."""
+	obstacles = [pygame.Rect(350, 200, 150, 50), pygame.Rect(400, 200, 50, 150),
+		pygame.Rect(150, 20, 50, 150), pygame.Rect(150, 120, 150, 50)]
+
+	return planner.VisibilityPRM(map_dimensions=(640, 480), radius=5, obstacles=obstacles,
+		M=30, seed=1).build()
+
+def check_consistent(planner_):
+	"""Checks the repaired roadmap against one checked from scratch."""
+	roadmap_ = planner_.graph.roadmap
+	edges = roadmap_.edges[:roadmap_.n_edges]
+	valid = ~planner_.graph.collider.cross_obstacles(starts=roadmap_.points[edges[:, 0]],
+		ends=roadmap_.points[edges[:, 1]])
+
+	assert np.array_equal(roadmap_.valid[:roadmap_.n_edges], valid)
+
+	# Nodes share a component exactly when the valid edges join them
+	for node1, node2 in edges[valid].tolist():
+		assert planner_.components.find(node1) == planner_.components.find(node2)
+
+	path = planner_.query(start=(50, 50), goal=(540, 380))
+	if path is not None:
+		assert not planner_.graph.collider.cross_obstacles(starts=np.array(path[:-1]),
+			ends=np.array(path[1:])).any()
+
+def test_add_move_remove():
+	planner_ = make_planner()
+	wall = pygame.Rect(250, 150, 30, 250)
+
+	added = planner_.add_obstacle(wall)
+	assert len(added)
+	check_consistent(planner_)
+
+	moved = wall.move(200, -100)
+	planner_.move_obstacle(wall, moved)
+	check_consistent(planner_)
+
+	# Every edge blocked by the wall is valid again once it is gone
+	planner_.remove_obstacle(moved)
+	check_consistent(planner_)
+	assert planner_.graph.roadmap.valid[:planner_.graph.roadmap.n_edges].all()
+
+def test_repair_leaves_ntry_unchanged():
+	planner_ = make_planner()
+	ntry, n_nodes = planner_.ntry, planner_.graph.roadmap.n_nodes
+
+	# The local samples add nodes, but do not count towards the coverage
+	planner_.add_obstacle(pygame.Rect(250, 150, 30, 250))
+	assert planner_.graph.roadmap.n_nodes > n_nodes
+	assert planner_.ntry == ntry
+	assert planner_.coverage == 1 - 1/ntry
+
+def test_repair_with_shapes():
+	planner_ = make_planner()
+	circle = shapes.Circle(center=(320, 240), radius=60)
+
+	planner_.add_obstacle(circle)
+	check_consistent(planner_)
+
+	planner_.move_obstacle(circle, shapes.Circle(center=(500, 100), radius=40))
+	check_consistent(planner_)
@@ -0,0 +1,129 @@
+import heapq
+import math
+import numpy as np
+import pygame
+import graph
+import roadmap
+
+def test_roadmap_grows_past_its_capacity():
+	roadmap_ = roadmap.Roadmap()
+	types = [roadmap.NodeType.GUARD, roadmap.NodeType.CONNECTION]
+
+	for i in range(100):
+		assert roadmap_.add_node(point=(i, 2*i), node_type=types[i % 2]) == i
+
+	for i in range(99):
+		assert roadmap_.add_edge(node1=i, node2=i + 1, valid=True) == i
+
+	assert len(roadmap_) == 100
+	assert roadmap_.center(70) == (70, 140)
+	assert roadmap_.find((70, 140)) == 70
+	assert roadmap_.find((1, 1)) is None
+	assert roadmap_.of_type(roadmap.NodeType.CONNECTION).tolist() == list(range(1, 100, 2))
+	assert sorted(roadmap_.neighbors(70).tolist()) == [69, 71]
+
+	# The adjacency is compressed again after an insertion
+	roadmap_.add_edge(node1=0, node2=70, valid=True)
+	assert sorted(roadmap_.neighbors(70).tolist()) == [0, 69, 71]
+	assert roadmap_.neighbors(99).tolist() == [98]
+
+def test_disjoint_set_matches_labels():
+	rng = np.random.default_rng(0)
+	components = roadmap.DisjointSet()
+	components.add(99)
+
+	# Component of every node, relabeled by hand on each union
+	labels = list(range(100))
+
+	for id1, id2 in rng.integers(low=0, high=100, size=(70, 2)).tolist():
+		assert components.union(id1, id2) == (labels[id1] != labels[id2])
+		old, new = labels[id2], labels[id1]
+		labels = [new if label == old else label for label in labels]
+
+	for id1 in range(100):
+		for id2 in range(100):
+			assert components.connected(id1, id2) == (labels[id1] == labels[id2])
+
+	sizes = np.bincount([components.find(id_) for id_ in range(100)], minlength=100)
+	assert sizes[sizes > 0].tolist() == [components.size[root]
+		for root in range(100) if components.find(root) == root]
+
+def make_graph(points):
+	graph_ = graph.Graph(start=None, goal=None, map_dimensions=(640, 480), radius=5)
+	ids = [graph_.add_node(center=point, node_type=roadmap.NodeType.GUARD) for point in points]
+
+	return graph_, ids
+
+def dijkstra(points, edges, start):
+	"""Length of the shortest path from the start to every node."""
+	neighbors = {}
+	for node1, node2 in edges:
+		length = math.dist(points[node1], points[node2])
+		neighbors.setdefault(node1, []).append((node2, length))
+		neighbors.setdefault(node2, []).append((node1, length))
+
+	distances, queue = {}, [(0, start)]
+	while queue:
+		distance, node = heapq.heappop(queue)
+		if node in distances:
+			continue
+
+		distances[node] = distance
+		for neighbor, length in neighbors.get(node, []):
+			heapq.heappush(queue, (distance + length, neighbor))
+
+	return distances
+
+def test_a_star_follows_valid_edges():
+	graph_, (a, b, c, d) = make_graph([(10, 240), (300, 220), (300, 460), (600, 240)])
+	edges = [graph_.add_edge(node1=node1, node2=node2) for node1, node2 in ((a, b), (b, d), (a, c),
+		(c, d))]
+
+	assert graph_.a_star(start=a, end=d)
+	assert graph_.path_coordinates[::-1] == [(10, 240), (300, 220), (600, 240)]
+
+	# Invalid edges are left out of the search, and the path goes around
+	graph_.roadmap.valid[edges[1]] = False
+	assert graph_.a_star(start=a, end=d)
+	assert graph_.path_coordinates[::-1] == [(10, 240), (300, 460), (600, 240)]
+
+	graph_.roadmap.valid[edges[3]] = False
+	assert not graph_.a_star(start=a, end=d)
+
+def test_a_star_finds_shortest_paths():
+	rng = np.random.default_rng(0)
+	points = [tuple(point) for point in rng.integers(low=0, high=(640, 480), size=(80, 2)).tolist()]
+	graph_, ids = make_graph(points)
+	edges = [(i, int(j)) for i in ids for j in rng.choice(len(ids), size=2, replace=False) if i != j]
+
+	for node1, node2 in edges:
+		graph_.add_edge(node1=node1, node2=node2)
+
+	distances = dijkstra(points, edges, start=0)
+
+	for end in ids[1:]:
+		assert graph_.a_star(start=0, end=end) == (end in distances)
+
+		if end in distances:
+			path = graph_.path_coordinates[::-1]
+			assert path[0] == points[0] and path[-1] == points[end]
+			assert math.isclose(sum(map(math.dist, path[:-1], path[1:])), distances[end])
+
+def test_edges_are_checked_when_inserted():
+	graph_, (a, b, c) = make_graph([(100, 240), (540, 240), (320, 60)])
+	graph_.obstacles = [pygame.Rect(300, 150, 40, 180)]
+
+	# Straight through the wall, and around it
+	through = graph_.add_edge(node1=a, node2=b)
+	around = [graph_.add_edge(node1=a, node2=c), graph_.add_edge(node1=c, node2=b)]
+	assert not graph_.roadmap.valid[through]
+	assert graph_.roadmap.valid[around].all()
+
+	assert graph_.a_star(start=a, end=b)
+	assert graph_.path_coordinates[::-1] == [(100, 240), (320, 60), (540, 240)]
+
+	# The links added by k_nearest are checked as well
+	graph_.k_nearest(graph=None, x_rand=graph_.make_node(center=(540, 240)),
+		configuration=graph_.make_node(center=(100, 240)), k=1)
+	assert graph_.roadmap.edges[graph_.roadmap.n_edges - 1].tolist() == [a, b]
+	assert not graph_.roadmap.valid[graph_.roadmap.n_edges - 1]
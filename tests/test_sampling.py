@@ -0,0 +1,96 @@
+import itertools
+import numpy as np
+import pygame
+import pytest
+import collision
+import occupancy_grid
+import sampling
+
+OBSTACLES = [pygame.Rect(350, 200, 150, 50), pygame.Rect(400, 200, 50, 150),
+	pygame.Rect(150, 20, 50, 150), pygame.Rect(150, 120, 150, 50)]
+
+def take(sampler, n):
+	return np.array(list(itertools.islice(sampler, n)))
+
+def make_collider(obstacles, occupancy):
+	if occupancy:
+		return occupancy_grid.OccupancyGrid(obstacles=obstacles, radius=10, map_dimensions=(640, 480))
+
+	return collision.RectangleCollider(obstacles=obstacles, radius=10)
+
+@pytest.mark.parametrize('occupancy', [False, True])
+def test_batch_matches_single_points(occupancy):
+	collider = make_collider(OBSTACLES, occupancy)
+	points = np.random.default_rng(0).integers(low=-20, high=(660, 500), size=(2000, 2))
+
+	assert collider.are_free(points=points).tolist() == [collider.is_free(point=tuple(point))
+		for point in points.tolist()]
+
+@pytest.mark.parametrize('occupancy', [False, True])
+def test_uniform_samples_are_free(occupancy):
+	collider = make_collider(OBSTACLES, occupancy)
+	sampler = sampling.UniformSampler(map_dimensions=(640, 480), collider=collider,
+		rng=np.random.default_rng(0), batch_size=256)
+	samples = take(sampler, 2000)
+
+	assert samples.shape == (2000, 2)
+	assert ((samples >= 0) & (samples < (640, 480))).all()
+	assert collider.are_free(points=samples).all()
+	assert len(np.unique(samples, axis=0)) > 1900
+
+	# The same generator state gives the same samples
+	again = sampling.UniformSampler(map_dimensions=(640, 480), collider=collider,
+		rng=np.random.default_rng(0), batch_size=256)
+	assert np.array_equal(take(again, 2000), samples)
+
+# A wall across the map, with a narrow passage
+WALL = [pygame.Rect(0, 200, 300, 40), pygame.Rect(330, 200, 310, 40)]
+
+def distances_to_wall(points):
+	"""Distance from every point to the closest obstacle of the wall."""
+	distances = []
+	for wall in WALL:
+		dx = np.maximum(np.maximum(wall.left - points[:, 0], points[:, 0] - wall.right), 0)
+		dy = np.maximum(np.maximum(wall.top - points[:, 1], points[:, 1] - wall.bottom), 0)
+		distances.append(np.hypot(dx, dy))
+
+	return np.min(distances, axis=0)
+
+def draw(name, obstacles, n=4000, **options):
+	collider = collision.RectangleCollider(obstacles=obstacles, radius=5)
+	sampler = sampling.SAMPLERS[name](map_dimensions=(640, 480), collider=collider,
+		rng=np.random.default_rng(0), **options)
+	samples = take(sampler, n)
+
+	assert ((samples >= 0) & (samples < (640, 480))).all()
+	assert collider.are_free(points=samples).all()
+
+	return samples
+
+def test_gaussian_samples_stay_near_obstacles():
+	uniform = (distances_to_wall(draw('uniform', WALL)) < 25).mean()
+	gaussian = (distances_to_wall(draw('gaussian', WALL)) < 25).mean()
+
+	assert gaussian > 2 * uniform
+
+def test_bridge_samples_find_the_passage():
+	def in_passage(samples):
+		return ((samples[:, 0] >= 300) & (samples[:, 0] < 330) & (samples[:, 1] >= 195) &
+			(samples[:, 1] < 245)).mean()
+
+	assert in_passage(draw('uniform', WALL)) < 0.01
+
+	# Without the share of uniform samples, only the passage is left
+	assert in_passage(draw('bridge', WALL, n=500, uniform_ratio=0)) > 0.95
+	assert in_passage(draw('bridge', WALL)) > in_passage(draw('uniform', WALL))
+
+def test_halton_samples_are_spread_evenly():
+	def counts(samples):
+		return np.histogram2d(samples[:, 0], samples[:, 1], bins=(8, 6),
+			range=((0, 640), (0, 480)))[0]
+
+	halton, uniform = counts(draw('halton', [], n=4800)), counts(draw('uniform', [], n=4800))
+
+	# 100 samples are expected in every cell
+	assert np.abs(halton - 100).max() < 10
+	assert halton.std() < uniform.std() / 2
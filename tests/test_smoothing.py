@@ -0,0 +1,53 @@
+import numpy as np
+import pygame
+import pytest
+import planner
+import smoothing
+
+OBSTACLES = [pygame.Rect(350, 200, 150, 50), pygame.Rect(400, 200, 50, 150),
+	pygame.Rect(150, 20, 50, 150), pygame.Rect(150, 120, 150, 50)]
+
+def make_path(seed):
+	"""Path of a query on the default map, and the collision checker of the robot."""
+	planner_ = planner.VisibilityPRM(map_dimensions=(640, 480), radius=10, obstacles=OBSTACLES,
+		M=30, seed=seed).build()
+
+	return planner_.query(start=(50, 50), goal=(540, 380)), planner_.graph.collider
+
+def check(processed, path, collider):
+	"""Same ends, no collision and no detour."""
+	assert processed[0] == path[0] and processed[-1] == path[-1]
+	assert not collider.cross_obstacles(starts=np.array(processed[:-1]),
+		ends=np.array(processed[1:])).any()
+	assert smoothing.length(processed) <= smoothing.length(path) + 1e-6
+
+@pytest.mark.parametrize('seed', range(5))
+def test_shortcut(seed):
+	path, collider = make_path(seed)
+	shortened = smoothing.shortcut(path=path, collider=collider)
+
+	check(shortened, path, collider)
+	assert set(shortened) <= set(path)
+	assert smoothing.shortcut(path=shortened, collider=collider) == shortened
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_shortcut(seed):
+	path, collider = make_path(seed)
+	shortened = smoothing.random_shortcut(path=path, collider=collider,
+		rng=np.random.default_rng(seed))
+
+	check(shortened, path, collider)
+	assert len(shortened) <= len(path)
+
+	# No waypoint is added within a pixel of another one
+	added = np.array([point for point in shortened if point not in path]).reshape(-1, 2)
+	distances = np.hypot(*(added[:, None] - np.array(path)).transpose(2, 0, 1))
+	assert (distances > 1).all()
+
+@pytest.mark.parametrize('seed', range(5))
+def test_smooth(seed):
+	path, collider = make_path(seed)
+	smoothed = smoothing.smooth(path=smoothing.shortcut(path=path, collider=collider),
+		collider=collider)
+
+	check(smoothed, path, collider)
@@ -0,0 +1,110 @@
+import numpy as np
+import spatial_index
+
+def test_nearest_matches_brute_force():
+	rng = np.random.default_rng(0)
+	points = rng.integers(low=0, high=(640, 480), size=(1000, 2))
+	index = spatial_index.SpatialIndex(cell_size=40)
+
+	for i, point in enumerate(points.tolist()):
+		assert index.insert(point=tuple(point), item=i) == i
+
+	for query in rng.uniform(low=-50, high=(690, 530), size=(50, 2)).tolist():
+		distances = np.hypot(*(points - query).T)
+
+		for k in (1, 5, 40):
+			assert np.allclose(distances[index.nearest(point=query, k=k)], np.sort(distances)[:k])
+
+		within = index.within(point=query, radius=60)
+		assert set(within.tolist()) == set(np.flatnonzero(distances <= 60).tolist())
+		assert np.all(np.diff(distances[within]) >= 0)
+
+def test_k_smallest():
+	points = np.array([(0, 0), (10, 0), (3, 4), (1, 1)])
+
+	assert spatial_index.k_smallest(points, point=(0, 0), k=3).tolist() == [0, 3, 2]
+	assert spatial_index.k_smallest(points, point=(0, 0), k=10).tolist() == [0, 3, 2, 1]
+	assert len(spatial_index.k_smallest(np.zeros((0, 2)), point=(0, 0), k=2)) == 0
+
+def random_segments(rng, n=400):
+	"""Segments of every length, from a few pixels to across the map."""
+	starts = rng.uniform(low=0, high=(640, 480), size=(n, 2))
+	lengths = rng.choice([5, 30, 150, 600], size=(n, 1))
+	angles = rng.uniform(0, 2*np.pi, size=(n, 1))
+
+	return np.hstack((starts, starts + lengths * np.hstack((np.cos(angles), np.sin(angles)))))
+
+def distances_to_segments(segments, point):
+	"""Distance from a point to every segment, by projecting it on them."""
+	starts, ends = segments[:, :2], segments[:, 2:]
+	direction = ends - starts
+	t = ((point - starts) * direction).sum(axis=1) / (direction**2).sum(axis=1)
+	closest = starts + t.clip(0, 1)[:, None] * direction
+
+	return np.hypot(*(closest - point).T)
+
+def make_edge_index(segments):
+	index = spatial_index.EdgeIndex(cell_size=20)
+
+	for i, (x1, y1, x2, y2) in enumerate(segments.tolist()):
+		assert index.insert(p1=(x1, y1), p2=(x2, y2), item=i) == i
+
+	return index
+
+def test_edges_match_brute_force():
+	rng = np.random.default_rng(0)
+	segments = random_segments(rng)
+	index = make_edge_index(segments)
+	boxes = np.hstack((np.minimum(segments[:, :2], segments[:, 2:]),
+		np.maximum(segments[:, :2], segments[:, 2:])))
+	t = np.linspace(0, 1, 2001)[:, None, None]
+	samples = segments[:, :2] + t * (segments[:, 2:] - segments[:, :2])
+
+	for corner, size in zip(rng.uniform(low=0, high=(640, 480), size=(50, 2)),
+		rng.uniform(low=1, high=120, size=(50, 2))):
+		box = (*corner, *(corner + size))
+		overlap = (boxes[:, 0] <= box[2]) & (boxes[:, 2] >= box[0]) & (boxes[:, 1] <= box[3]) & \
+			(boxes[:, 3] >= box[1])
+		assert index.intersecting(box).tolist() == np.flatnonzero(overlap).tolist()
+
+		# Sampled points may miss a segment that barely clips a corner
+		inside = ((samples >= corner) & (samples <= corner + size)).all(axis=2).any(axis=0)
+		crossing = set(index.crossing(box).tolist())
+		assert set(np.flatnonzero(inside).tolist()) <= crossing <= set(np.flatnonzero(overlap).tolist())
+
+	for point in rng.uniform(low=-50, high=(690, 530), size=(50, 2)):
+		distances = distances_to_segments(segments, point)
+
+		for k in (1, 5, 30):
+			assert np.allclose(distances[index.nearest(point=tuple(point), k=k)],
+				np.sort(distances)[:k])
+
+def test_edges_take_the_buckets_they_cross():
+	rng = np.random.default_rng(1)
+	points = rng.integers(low=0, high=(640, 480), size=(200, 2))
+
+	# Integer ends, some along the borders of the buckets, as on the roadmap
+	segments = np.vstack((random_segments(rng), np.hstack((points, np.roll(points, 1, axis=0))),
+		[[0, 0, 1000, 1000], [20, 40, 300, 40], [60, 0, 60, 200], [0, 0, 60, 20]]))
+	index = make_edge_index(segments)
+	buckets = {}
+	for cell, ids in index.cells.items():
+		for id_ in ids:
+			buckets.setdefault(id_, set()).add(cell)
+
+	t = np.linspace(0, 1, 2001)[:, None]
+	for id_, segment in enumerate(segments):
+		samples = segment[:2] + t * (segment[2:] - segment[:2])
+		assert set(map(tuple, (samples // 20).astype(int).tolist())) <= buckets[id_]
+
+		# Proportional to the length, not to the area of the bounding box
+		columns, rows = np.abs(segment[2:] // 20 - segment[:2] // 20)
+		assert len(buckets[id_]) <= 2*columns + rows + 1
+
+	assert len(buckets[len(segments) - 4]) <= 3*51 < 51*51
+
+	# Adding every edge at once fills the same buckets
+	extended = spatial_index.EdgeIndex(cell_size=20)
+	extended.extend(starts=segments[:, :2], ends=segments[:, 2:], items=range(len(segments)))
+	assert extended.cells == index.cells
+	assert (extended.min_cell, extended.max_cell) == (index.min_cell, index.max_cell)
@@ -1,14 +1,28 @@
 import pygame
 import environment 
-import graph
+import export
+import maps
+import planner
+import renderer
+import sampling
+import smoothing
+import termination
 import argparse
+import atexit
+import cProfile
+import instrumentation
+import os
 import sys
+import time
 
 # Command line arguments
 parser = argparse.ArgumentParser(description='Implements the Visibility PRM algorithm for \
 	path planning.')
 parser.add_argument('-o', '--obstacles', type=bool, action=argparse.BooleanOptionalAction,
 	metavar='', required=False, help='Obstacles on the map')
+parser.add_argument('-mp', '--map', type=str, metavar='', required=False,
+	help='JSON file describing the obstacles as rectangles, polygons and circles, or occupancy \
+	map as a .npy grid, a PGM or PNG image, or a ROS .yaml description, which sets the map size')
 parser.add_argument('-init', '--x_init', nargs='+', type=int, metavar='', required=False,
 	help='Initial node position in X and Y respectively')
 parser.add_argument('-goal', '--x_goal', nargs='+', type=int, metavar='', required=False,
@@ -27,211 +41,201 @@ parser.add_argument('-sve', '--show_volume_estimation', type=bool,
 parser.add_argument('-M', '--M', type=int, metavar='', required=False, default=10,
 	help='Maximum number of failures before allowed before inserting a new guard node into the \
 	roadmap ')
+parser.add_argument('-c', '--coverage', type=float, metavar='', required=False,
+	help='Stops once this fraction of the free space is covered, instead of after M failures')
+parser.add_argument('-cf', '--confidence', type=float, metavar='', required=False, default=0.95,
+	help='Confidence of the coverage estimate')
+parser.add_argument('-ms', '--max_samples', type=int, metavar='', required=False,
+	help='Maximum number of free samples drawn to build the roadmap')
+parser.add_argument('-mt', '--max_seconds', type=float, metavar='', required=False,
+	help='Maximum time in seconds to build the roadmap')
+parser.add_argument('-uc', '--until_connected', type=bool, action=argparse.BooleanOptionalAction,
+	metavar='', required=False, help='Stops as soon as the initial and goal nodes are connected')
+parser.add_argument('-at', '--anytime', type=bool, action=argparse.BooleanOptionalAction,
+	metavar='', required=False, help='Attaches the initial and goal nodes while building the roadmap, \
+	stopping at the first path found')
+parser.add_argument('-rf', '--refine', type=bool, action=argparse.BooleanOptionalAction,
+	metavar='', required=False, help='Keeps building after the first path, following shorter ones')
+parser.add_argument('-sc', '--shortcut', type=bool, action=argparse.BooleanOptionalAction,
+	metavar='', required=False, help='Shortens the path skipping the waypoints in sight, and with \
+	random shortcuts')
+parser.add_argument('-sm', '--smooth', type=bool, action=argparse.BooleanOptionalAction,
+	metavar='', required=False, help='Rounds the corners of the path with Bezier curves')
 parser.add_argument('-kr', '--keep_roadmap', type=bool, action=argparse.BooleanOptionalAction, 
 	metavar='', required=False, help='Keeps the tree while the robot is moving towards the goal')
 parser.add_argument('-r', '--radius', type=int, metavar='', required=False, default=10,
 	help='Set the robot radius')
+parser.add_argument('-og', '--occupancy_grid', type=bool, action=argparse.BooleanOptionalAction,
+	metavar='', required=False, help='Check collisions in a precomputed occupancy grid')
+parser.add_argument('-s', '--seed', type=int, metavar='', required=False,
+	help='Seed of the random samples, so the same roadmap is built on every run')
+parser.add_argument('-sa', '--sampler', type=str, metavar='', required=False, default='uniform',
+	choices=list(sampling.SAMPLERS), help='Sampling strategy: uniform, halton, gaussian or bridge')
+parser.add_argument('-w', '--workers', type=int, metavar='', required=False, default=1,
+	help='Number of processes checking the samples while building the roadmap, and rendering \
+	the exported frames')
+parser.add_argument('-sr', '--save_roadmap', type=str, metavar='', required=False,
+	help='Directory where the roadmap is saved once built')
+parser.add_argument('-lr', '--load_roadmap', type=str, metavar='', required=False,
+	help='Directory of a saved roadmap to use instead of building one')
+parser.add_argument('-ex', '--export', type=str, metavar='', required=False,
+	help='Renders every frame without a window into this directory as PNG images, or into \
+	this file as an array if ending with .npy')
+parser.add_argument('-p', '--profile', type=bool, action=argparse.BooleanOptionalAction,
+	metavar='', required=False, help='Show the counters of the hot paths and the time of each phase')
+parser.add_argument('-ps', '--pstats', type=str, metavar='', required=False,
+	help='File where the cProfile statistics of the run are written')
+parser.add_argument('-hl', '--headless', type=bool, action=argparse.BooleanOptionalAction,
+	metavar='', required=False, help='Builds the roadmap and queries it without any display')
 args = parser.parse_args()
 
-# Initialization 
-pygame.init()
+if args.coverage is not None and not 0 < args.coverage < 1:
+	parser.error('--coverage must be between 0 and 1')
+
+if not 0 < args.confidence < 1:
+	parser.error('--confidence must be between 0 and 1')
+
+# Occupancy maps are memory-mapped rather than loaded, and set the size of the map
+grid_map = None
+
+if args.map is not None and not args.map.lower().endswith('.json'):
+	grid_map = maps.load(args.map)
 
 # Constants
-MAP_DIMENSIONS = 640, 480
+MAP_DIMENSIONS = (grid_map.WIDTH, grid_map.HEIGHT) if grid_map is not None else (640, 480)
 
 # Initial and final position of the robot
 x_init = tuple(args.x_init) if args.x_init is not None else (50, 50)
 x_goal = tuple(args.x_goal) if args.x_goal is not None else (540, 380)
 
-# Instantiating the environment and the graph
-environment_ = environment.Environment(map_dimensions=MAP_DIMENSIONS)
-graph_ = graph.Graph(start=x_init, goal=x_goal, map_dimensions=MAP_DIMENSIONS, radius=args.radius)
+# Initialization 
+if args.export is not None:
+	os.environ['SDL_VIDEODRIVER'] = 'dummy'
 
-def main():
-	run = True
-	clock = pygame.time.Clock()
-	guards = []
-	connections = []
-	configurations = []
-	initial = graph_.draw_initial_node(map_=environment_.map)
-	goal = graph_.draw_goal_node(map_=environment_.map)
-	configurations.append(initial)
-	configurations.append(goal)
-	environment_.make_obstacles()
-	obstacles = environment_.draw_obstacles() if args.obstacles else []
-	graph_.obstacles = obstacles
-
-	# Number of failures before the insertion of a new guard node
-	ntry = 0
-	node_number = 0
-
-	repeated_guards = []
-	is_found_repeated = False
-
-	len_guards = len(guards)
-	len_connections = len(connections)
-
-	connectors = 0
-
-	# To keep track and later merge the hanging guardian nodes
-	hanging_guardians = []
-	temp_dictionary = {}
-	is_track_finished = False # Avoid overflow of the dictionary
+if not args.headless:
+	pygame.init()
 
+# Instantiating the environment
+environment_ = environment.Environment(map_dimensions=MAP_DIMENSIONS, headless=args.headless)
+
+def main():
+	# Only the obstacles the planner avoids are drawn, by the display and the exported frames
+	if args.map is None:
+		if args.obstacles:
+			environment_.make_obstacles()
+	elif grid_map is None:
+		environment_.load_obstacles(args.map)
+	elif not args.headless:
+		environment_.load_map(grid_map)
+
+	obstacles = environment_.sides
+	metrics = instrumentation.metrics
+	metrics.enabled = bool(args.profile)
+
+	# Whichever way the run ends, the metrics are shown last
+	if args.profile or args.show_volume_estimation:
+		atexit.register(lambda: print(metrics.summary()))
+
+	# The roadmap is built without the display, which only replays it afterwards
+	planner_ = planner.VisibilityPRM(map_dimensions=MAP_DIMENSIONS, radius=args.radius,
+		obstacles=obstacles, M=args.M, occupancy_grid=args.occupancy_grid,
+		sampler=args.sampler, seed=args.seed, grid_map=grid_map)
+	graph_ = planner_.graph
+
+	if not args.headless:
+		renderer_ = renderer.Renderer(environment=environment_, graph=graph_,
+			show_random_nodes=args.show_random_nodes, show_rejected_nodes=args.show_rejected_nodes,
+			show_enumerated_nodes=args.show_enumerated_nodes)
+		planner_.observers.append(renderer_)
+
+	termination_ = termination.Termination(M=args.M if args.coverage is None else None,
+		coverage=args.coverage, confidence=args.confidence, max_samples=args.max_samples,
+		max_seconds=args.max_seconds, start=x_init if args.until_connected else None,
+		goal=x_goal)
+	path = None
+
+	if args.load_roadmap is not None:
+		try:
+			planner_.load(args.load_roadmap)
+		except ValueError as error:
+			parser.error(str(error))
+	elif args.anytime:
+		started = time.perf_counter()
+		paths = planner_.anytime(start=x_init, goal=x_goal, termination_=termination_)
+		path = next(paths, None)
+		metrics.gauge('Time to first path', f'{time.perf_counter() - started:.4f} s')
+
+		if args.refine:
+			for path in paths:
+				pass
+	else:
+		planner_.build(workers=args.workers, termination_=termination_)
+
+		# Start and goal may be joined through nodes other than the nearest ones
+		if termination_.connected:
+			path = termination_.anchors.path(graph=graph_)
+
+	if args.load_roadmap is None:
+		metrics.gauge('Construction stopped by', termination_.reason or 'first path')
+		metrics.gauge(f'Covered volume with {100*args.confidence:g}% confidence',
+			f'{100*termination_.estimate:.4f}%')
+
+	if args.save_roadmap is not None:
+		planner_.save(args.save_roadmap)
+
+	if args.show_volume_estimation:	
+		metrics.gauge('Estimated volume not yet covered by visibility domains',
+			f'{100*(1-planner_.coverage):.4f}%')
+		metrics.gauge('Estimated volume covered by visibility domains',
+			f'{100*planner_.coverage:.4f}%')
+
+	if path is None and not args.anytime:
+		path = planner_.query(start=x_init, goal=x_goal)
+
+	if path is not None:
+		with metrics.timer('smoothing'):
+			if args.shortcut:
+				path = smoothing.shortcut(path=path, collider=graph_.collider)
+				path = smoothing.random_shortcut(path=path, collider=graph_.collider,
+					rng=planner_.rng)
+
+			if args.smooth:
+				path = smoothing.smooth(path=path, collider=graph_.collider)
+
+		metrics.gauge('Path length', f'{smoothing.length(path):.2f} px')
+		graph_.follow(path=path)
+
+	if args.headless:
+		print(f'Seed: {planner_.seed}')
+		print(f'Guard nodes: {len(planner_.guards)}, connection nodes: {len(planner_.connections)}')
+		print(f'Path to goal: {path}')
+		sys.exit()
+
+	if path is None:
+		sys.exit('Roadmap not sufficiently connected. Try increasing the maximum number of failures.')
+
+	if args.export is not None:
+		frames = export.export(renderer_=renderer_, output=args.export,
+			keep_roadmap=args.keep_roadmap, workers=args.workers)
+		print(f'Frames exported: {frames}')
+		sys.exit()
+
+	# Show the construction of the roadmap and the connection of the query
+	environment_.draw_obstacles()
+	renderer_.draw()
+	graph_.draw_roadmap(map_=environment_.map)
+	pygame.display.update()
+	run = renderer_.wait(seconds=2)
+
+	# Animate the robot towards goal, then show its path
 	while run:
-		clock.tick(environment_.FPS) 
-		for event in pygame.event.get():
-			if event.type == pygame.QUIT:
-				run = False
-
-		obstacles = environment_.draw_obstacles() if args.obstacles else []
-		
-		while ntry < args.M:
-			# Select a random free configuration
-			x_rand = graph_.generate_random_node()
-			collision_free = graph_.is_free(point=x_rand, obstacles=obstacles)
-			is_connected = False
-
-			if collision_free:
-				if args.show_random_nodes:
-					graph_.draw_random_node(map_=environment_.map)
-
-				if len(guards) == 0:
-					guards.append(x_rand)
-					graph_.draw_guard_node(map_=environment_.map, position=x_rand.center)
-					continue
-				elif len(guards) == 1:
-					# for i in range(len(guards)):
-					cross_obstacle1 = graph_.cross_obstacle(configuration1=x_rand,
-						configuration2=guards[0], map_=environment_.map)
-
-					if cross_obstacle1:
-						guards.append(x_rand)
-						graph_.draw_guard_node(map_=environment_.map, position=x_rand.center)
-					else:
-						ntry += 1
-						if not is_connected and args.show_rejected_nodes:
-							graph_.draw_rejected_node(map_=environment_.map,
-								position=x_rand.center)
-
-				for i in range(len(guards)):
-					rejection = 0
-					cross_obstacle1 = graph_.cross_obstacle(configuration1=x_rand, 
-						configuration2=guards[i], map_=environment_.map)
-
-					if not cross_obstacle1: # Connected to the first component
-						for j in range(i+1, len(guards)):
-							if x_rand == guards[j]:
-								break # Prevents attempting to connect the node with the same node
-							cross_obstacle2 = graph_.cross_obstacle(configuration1=x_rand, 
-								configuration2=guards[j], map_=environment_.map)
-
-							if not cross_obstacle2: # Connected to the second component
-								# Avoid repeated connections once two guards have already 
-								# been connected
-								for guard in repeated_guards:
-									if guards[i] == guard[0] and guards[j] == guard[1]:
-										is_found_repeated = True
-								
-								if is_found_repeated:
-									if args.show_rejected_nodes:
-										graph_.draw_rejected_node(map_=environment_.map,
-											position=x_rand.center)
-									is_found_repeated = False
-									continue
-
-								repeated_guards.append([guards[i], guards[j]])
-								is_connected = True
-								connections.append(x_rand)
-
-								# Add the neighbors of the connector node
-								graph_.neighbors.update({x_rand.center: \
-									[guards[i].center, guards[j].center]})
-
-								# Keep track of the guardians neighbors
-								hanging_guardians.append([guards[i].center, x_rand.center])
-								hanging_guardians.append([guards[j].center, x_rand.center])
-
-								graph_.draw_connection_node(map_=environment_.map, 
-									position=x_rand.center)
-								graph_.draw_local_planner(p1=x_rand, p2=guards[i], 
-									map_=environment_.map)
-								graph_.draw_local_planner(p1=x_rand, p2=guards[j], 
-									map_=environment_.map)
-							else:
-								if not is_connected and args.show_rejected_nodes:
-									graph_.draw_rejected_node(map_=environment_.map, 
-										position=x_rand.center)
-
-					if cross_obstacle1:
-						rejection += 1
-						ntry += 1
-						for j in range(i+1, len(guards)):
-							if x_rand == guards[j]:
-								break # Prevents attempting to connect the node with the same node
-							cross_obstacle2 = graph_.cross_obstacle(configuration1=x_rand, 
-								configuration2=guards[j], map_=environment_.map)
-
-							if cross_obstacle2:
-								rejection += 1
-								ntry += 1
-
-								# All the attempts to connect to guards were unsuccessful, therefore
-								# the node is a guard node
-								if rejection == len(guards):
-									ntry = 0
-									guards.append(x_rand)
-									graph_.draw_guard_node(map_=environment_.map, 
-										position=x_rand.center)								
-							else:
-								rejection = 0
-								if not is_connected and args.show_rejected_nodes:
-									graph_.draw_rejected_node(map_=environment_.map, 
-										position=x_rand.center)
-
-				node_number += 1
-				pygame.display.update()
-				is_change_made = len(guards) > len_guards or len(connections) > len_connections
-
-				if args.show_enumerated_nodes:
-					if not args.show_rejected_nodes and is_change_made:
-						len_guards = len(guards)
-						len_connections = len(connections)
-						environment_.draw_node_number(number=node_number, point=x_rand.center)
-					elif args.show_rejected_nodes:
-						environment_.draw_node_number(number=node_number, point=x_rand.center)
-
-		# Merge the guardians and their neighbors in a dictionary 
-		if not is_track_finished:
-			# Merge guard and connection nodes, and query the initial and goal configurations
-			configurations += guards + connections
-			for guard in hanging_guardians:
-			    key = guard[0]
-			    value = guard[1:]
-			    if key in temp_dictionary:
-			        temp_dictionary[key].extend(value)
-			    else:
-			        temp_dictionary[key] = value
-			is_track_finished = True
-
-		if args.show_volume_estimation:	
-			print(f'Estimated volume not yet covered by visibility domains {100*(1/ntry):.4f}%')
-			print(f'Estimated volume covered by visibility domains {100*(1-1/ntry):.4f}%')
-			args.show_volume_estimation = False
-
-		graph_.neighbors.update(temp_dictionary)
-		graph_.query(init=initial, goal=goal, configurations=configurations, map_=environment_.map)
-
-		# Find shortest path, perform animation towards goal, and draw the robot trail
-		graph_.a_star(nodes=configurations, map_=environment_.map)
-		graph_.draw_roadmap(map_=environment_.map)
-		graph_.draw_trajectory(configurations=configurations, environment=environment_,
-			obstacles=obstacles, keep_roadmap=args.keep_roadmap)
-		graph_.draw_path_to_goal(environment=environment_, obstacles=obstacles)
-		pygame.display.update()
+		run = renderer_.animate(keep_roadmap=args.keep_roadmap)
 
 	pygame.quit()
 	sys.exit()
 
 if __name__ == '__main__':
-	main()
\ No newline at end of file
+	if args.pstats is not None:
+		cProfile.run('main()', filename=args.pstats)
+	else:
+		main()